@@ -0,0 +1,9 @@
+"""Abacus model: a Qt-free core that headless tools can import without PyQt6.
+
+The GUI lives in the top-level ui/ package and imports this package, never the
+other way round.
+"""
+from abacus.model import Abacus, NUM_EARTH_BEADS, NUM_HEAVEN_BEADS, NUM_ROD_STATES
+from abacus.batch import AbacusBatch
+
+__all__ = ["Abacus", "AbacusBatch", "NUM_EARTH_BEADS", "NUM_HEAVEN_BEADS", "NUM_ROD_STATES"]
@@ -0,0 +1,182 @@
+from abacus.model import Abacus, _DIGIT_STATES, _ROD_VALUES, _int_to_digits, _pow10
+
+
+def _numpy():
+    # NumPy is an optional dependency used only by AbacusBatch, imported on first use
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("AbacusBatch requires NumPy (pip install numpy)") from e
+    return numpy
+
+
+class AbacusBatch:
+    """Many abaci with the same rod count, stepped in lockstep with NumPy.
+
+    Bead state is a (n_abaci, num_rods) uint8 array using the same packed rod
+    encoding as Abacus._state, so rows convert to and from Abacus instances
+    without translation. add/subtract/set_values follow the Abacus rules exactly
+    (same rods touched, same bead settings), vectorized over abaci; the carry
+    loop runs once per rod.
+    """
+
+    # Rods per int64 chunk when extracting values; 18 rods of up to 15 each stay below 2**63
+    _VALUE_CHUNK = 18
+
+    def __init__(self, n_abaci, num_rods=13):
+        np = _numpy()
+        self.num_rods = num_rods
+        self.states = np.zeros((n_abaci, num_rods), dtype=np.uint8)
+        self._rod_values = np.array(_ROD_VALUES, dtype=np.int16)
+        self._digit_states = np.frombuffer(_DIGIT_STATES, dtype=np.uint8)
+
+    @classmethod
+    def from_abaci(cls, abaci):
+        np = _numpy()
+        abaci = list(abaci)
+        num_rods = abaci[0].num_rods if abaci else 13
+        batch = cls(len(abaci), num_rods)
+        for row, abacus in enumerate(abaci):
+            if abacus.num_rods != num_rods:
+                raise ValueError("All abaci in a batch must have the same number of rods")
+            batch.states[row] = np.frombuffer(abacus._state, dtype=np.uint8)
+        return batch
+
+    @classmethod
+    def from_states(cls, states):
+        """Wraps an existing (n_abaci, num_rods) uint8 array of packed rod states without copying it.
+
+        The batch reads and writes `states` in place, e.g. a memory-mapped
+        abacus.store.StateStore view.
+        """
+        np = _numpy()
+        if states.dtype != np.uint8 or states.ndim != 2:
+            raise ValueError("states must be a 2-D uint8 array of packed rod states")
+        batch = cls(0, states.shape[1])
+        batch.states = states
+        return batch
+
+    def __len__(self):
+        return len(self.states)
+
+    def to_abacus(self, index):
+        """Returns a standalone Abacus holding a copy of one row."""
+        abacus = Abacus(self.num_rods)
+        for rod_index, state in enumerate(self.states[index].tobytes()):
+            abacus._set_rod_state(rod_index, state)
+        return abacus
+
+    def reset(self, mask=None):
+        if mask is None:
+            self.states.fill(0)
+        else:
+            self.states[self._mask(mask)] = 0
+
+    def get_digits(self):
+        """(n_abaci, num_rods) int16 array of rod values, most significant rod first."""
+        return self._rod_values[self.states]
+
+    def get_values(self):
+        """Values of every abacus: int64 array up to 18 rods, otherwise an object array of ints."""
+        np = _numpy()
+        digits = self.get_digits().astype(np.int64)
+        values = None
+        for start in range(0, self.num_rods, self._VALUE_CHUNK):
+            chunk = digits[:, start:start + self._VALUE_CHUNK]
+            powers = 10 ** np.arange(chunk.shape[1] - 1, -1, -1, dtype=np.int64)
+            chunk_values = chunk @ powers
+            if values is None:
+                values = chunk_values
+            else:
+                if values.dtype != object:
+                    values = values.astype(object)
+                values = values * _pow10(chunk.shape[1]) + chunk_values.astype(object)
+        if values is None:
+            values = np.zeros(len(self), dtype=np.int64)
+        return values
+
+    def add(self, operands, mask=None):
+        """Adds per-abacus (or one shared) operands; see subtract() for the return value."""
+        return self._apply_operands(operands, 1, mask)
+
+    def subtract(self, operands, mask=None):
+        """Subtracts per-abacus (or one shared) operands from the masked abaci.
+
+        Returns a bool array marking the abaci that were updated. Abaci whose result
+        would not fit (where Abacus raises ValueError) are left unchanged.
+        """
+        return self._apply_operands(operands, -1, mask)
+
+    def set_values(self, values, mask=None):
+        """Sets the masked abaci to the standard bead setting of their values.
+
+        Returns a bool array of the abaci that were set; values that do not fit are skipped.
+        """
+        mask = self._mask(mask)
+        digits, too_long = self._operand_digits(values)
+        signs = self._operand_signs(values)
+        applied = mask & ~too_long & (signs >= 0)
+        self.states[applied] = self._digit_states[digits[applied]]
+        return applied
+
+    def _mask(self, mask):
+        np = _numpy()
+        if mask is None:
+            return np.ones(len(self), dtype=bool)
+        return np.asarray(mask, dtype=bool)
+
+    def _operand_signs(self, operands):
+        np = _numpy()
+        operands = np.broadcast_to(np.asarray(operands), (len(self),))
+        if operands.dtype == object:
+            return np.array([(value > 0) - (value < 0) for value in operands], dtype=np.int16)
+        return np.sign(operands).astype(np.int16)
+
+    def _operand_digits(self, operands):
+        """Digit matrix of |operands| aligned to the rods, plus rows with too many digits."""
+        np = _numpy()
+        n_abaci, num_rods = self.states.shape
+        operands = np.broadcast_to(np.asarray(operands), (n_abaci,))
+        digits = np.zeros((n_abaci, num_rods), dtype=np.int16)
+        if operands.dtype == object:
+            # Operands beyond int64: convert row by row through the chunked int helper
+            too_long = np.zeros(n_abaci, dtype=bool)
+            for row, value in enumerate(operands):
+                row_digits = _int_to_digits(abs(int(value)))
+                if len(row_digits) > num_rods:
+                    too_long[row] = True
+                    continue
+                digits[row, num_rods - len(row_digits):] = np.frombuffer(row_digits, dtype=np.uint8)
+            return digits, too_long
+        remaining = np.abs(operands.astype(np.int64))
+        for rod_index in range(num_rods - 1, -1, -1):
+            if not remaining.any():
+                break
+            remaining, digits[:, rod_index] = np.divmod(remaining, 10)
+        return digits, remaining != 0
+
+    def _apply_operands(self, operands, sign, mask):
+        np = _numpy()
+        mask = self._mask(mask)
+        operand_digits, too_long = self._operand_digits(operands)
+        # add(-n) is subtract(n) and vice versa, as on Abacus
+        row_signs = np.where(self._operand_signs(operands) < 0, -sign, sign).astype(np.int16)
+        # Work rod-major so each step of the carry loop reads contiguous rows
+        deltas = np.ascontiguousarray((operand_digits * row_signs[:, None]).T)
+        digits = np.ascontiguousarray(self.get_digits().T)
+        new_digits = digits.copy()
+        touched = np.zeros(digits.shape, dtype=bool)
+        carry = np.zeros(len(self), dtype=np.int16)
+        for rod_index in range(self.num_rods - 1, -1, -1):
+            delta = deltas[rod_index] + carry
+            # Same rule as Abacus._apply_operand: a rod changes only if an operand
+            # digit or a carry reaches it
+            rod_touched = np.not_equal(delta, 0, out=touched[rod_index])
+            carry, new_digit = np.divmod(digits[rod_index] + delta, 10)
+            np.copyto(new_digits[rod_index], new_digit, where=rod_touched)
+            carry *= rod_touched
+
+        applied = mask & ~too_long & (carry == 0)
+        update = touched.T & applied[:, None]
+        self.states[update] = self._digit_states[new_digits.T[update]]
+        return applied
@@ -0,0 +1,266 @@
+"""Binary event log of abacus bead moves, and a Qt-free replay engine.
+
+A log starts with a 16-byte header (magic, version, record size, rod count,
+checkpoint interval), followed by blocks. Each block is a checkpoint, which is
+the packed state of every rod (one byte per rod, as in Abacus._state), followed
+by up to `checkpoint_interval` fixed-width records:
+
+    uint32 rod index, uint8 bead type (0 heaven, 1 earth), uint8 bead index,
+    uint8 flags, 1 pad byte
+
+FLAG_CARRY marks a move that is the carry step of an earlier move. FLAG_STATE
+marks a direct rod write (add(), set_value(), apply_changes(), ...): the new
+packed rod state is stored in the bead type field. The first checkpoint holds
+the state when recording started. Every offset follows from the header, so a
+reader can seek to any record or checkpoint without scanning. A log cut short
+by a crash stays readable up to its last complete record.
+
+    python -m abacus.eventlog info session.abl
+    python -m abacus.eventlog replay session.abl [--to N] [--no-checkpoints]
+"""
+import mmap
+import struct
+import time
+
+from abacus.model import Abacus, NUM_HEAVEN_BEADS, NUM_ROD_STATES, _BEAD_SLOTS, _get_transition_table
+
+MAGIC = b"ABEV"
+VERSION = 1
+
+FLAG_CARRY = 0x01 # The move is a carry step produced by the previous move
+FLAG_STATE = 0x02 # Direct rod write; the bead type field holds the new rod state
+
+_HEADER = struct.Struct("<4sHHII") # magic, version, record size, num_rods, checkpoint interval
+_RECORD = struct.Struct("<IBBBx") # rod index, bead type, bead index, flags
+
+_BEAD_TYPES = {"heaven": 0, "earth": 1}
+_BEAD_TYPE_NAMES = ("heaven", "earth")
+
+DEFAULT_CHECKPOINT_INTERVAL = 1 << 16 # Records between checkpoints
+DEFAULT_BUFFER_SIZE = 1 << 16 # Bytes collected before each write to the file
+
+
+class EventLogWriter:
+    """Records every bead move and rod write of one Abacus to a log file.
+
+    Creating the writer attaches it with abacus.add_recorder() and writes the
+    header and a checkpoint of the current state straight to the file, so a
+    session killed before its first flush still leaves a readable log. close() (or
+    leaving a `with` block) flushes the buffer and detaches it. Records are packed
+    into an in-memory buffer and written `buffer_size` bytes at a time.
+    """
+
+    def __init__(self, path, abacus, checkpoint_interval=DEFAULT_CHECKPOINT_INTERVAL,
+                 buffer_size=DEFAULT_BUFFER_SIZE):
+        self.path = path
+        self.abacus = abacus
+        self.checkpoint_interval = checkpoint_interval
+        self.buffer_size = buffer_size
+        self.records_written = 0
+        self._until_checkpoint = checkpoint_interval
+        # Rod states as of the last record. Bulk writes (add(), set_value(), ...) update every
+        # rod before recording them one by one, so abacus._state can be ahead of the log.
+        self._shadow = bytearray(abacus._state)
+        self._buffer = bytearray(_HEADER.pack(MAGIC, VERSION, _RECORD.size, abacus.num_rods,
+                                              checkpoint_interval))
+        self._buffer += self._shadow # Checkpoint 0: the state recording starts from
+        self._file = open(path, "wb")
+        self.flush()
+        abacus.add_recorder(self)
+
+    def begin_operation(self):
+        pass # The log keeps individual records; only carry moves are tied to what came before
+
+    def record_move(self, rod_index, bead_type, bead_index, carry=False):
+        self._shadow[rod_index] = self.abacus._state[rod_index] # A move is recorded right after its own write
+        self._append(rod_index, _BEAD_TYPES[bead_type], bead_index, FLAG_CARRY if carry else 0)
+
+    def record_state(self, rod_index, state):
+        self._shadow[rod_index] = state
+        self._append(rod_index, state, 0, FLAG_STATE)
+
+    def _append(self, rod_index, bead_type, bead_index, flags):
+        buffer = self._buffer
+        buffer += _RECORD.pack(rod_index, bead_type, bead_index, flags)
+        self.records_written += 1
+        self._until_checkpoint -= 1
+        if not self._until_checkpoint:
+            buffer += self._shadow # State after this record, starting the next block
+            self._until_checkpoint = self.checkpoint_interval
+        if len(buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        self._file.write(self._buffer)
+        self._buffer.clear()
+        self._file.flush()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+        self.abacus.remove_recorder(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class EventLogReader:
+    """Memory-mapped view of a log: random access to records and fast replay."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            # Checked before mapping: mmap refuses empty files with its own error
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise ValueError(f"{path}: not an abacus event log")
+            magic, version, record_size, num_rods, interval = _HEADER.unpack(header)
+            if magic != MAGIC or record_size != _RECORD.size or interval < 1:
+                raise ValueError(f"{path}: not an abacus event log")
+            if version != VERSION:
+                raise ValueError(f"{path}: unsupported event log version {version}")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.num_rods = num_rods
+        self.checkpoint_interval = interval
+        self._block_size = num_rods + interval * _RECORD.size
+        # Complete records and checkpoints present (a crashed writer may leave a partial tail)
+        body = len(self._map) - _HEADER.size
+        blocks, tail = divmod(body, self._block_size)
+        self.num_records = blocks * interval + max(tail - num_rods, 0) // _RECORD.size
+        self.num_checkpoints = blocks + (tail >= num_rods)
+        self.last_replay_seconds = None
+        self.last_replay_records = None
+
+    def __len__(self):
+        return self.num_records
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _record_offset(self, index):
+        block, position = divmod(index, self.checkpoint_interval)
+        return _HEADER.size + block * self._block_size + self.num_rods + position * _RECORD.size
+
+    def checkpoint(self, block):
+        """Packed rod states after `block * checkpoint_interval` records."""
+        if not 0 <= block < self.num_checkpoints:
+            raise IndexError("Checkpoint index out of range")
+        offset = _HEADER.size + block * self._block_size
+        return self._map[offset:offset + self.num_rods]
+
+    def iter_records(self, start=0, stop=None):
+        """Yields (rod_index, bead_type, bead_index, flags) for records [start, stop).
+
+        bead_type is 'heaven' or 'earth' for moves and the packed rod state for
+        FLAG_STATE records.
+        """
+        for rod_index, bead_type, bead_index, flags in self._iter_raw(start, stop):
+            if not flags & FLAG_STATE:
+                bead_type = _BEAD_TYPE_NAMES[bead_type]
+            yield rod_index, bead_type, bead_index, flags
+
+    def _iter_raw(self, start, stop):
+        stop = self.num_records if stop is None else min(stop, self.num_records)
+        while start < stop:
+            # Records are contiguous up to the next checkpoint. Slicing copies at most one
+            # block, and leaves no buffer exported that would stop close() mid-iteration.
+            block_end = min((start // self.checkpoint_interval + 1) * self.checkpoint_interval, stop)
+            offset = self._record_offset(start)
+            yield from _RECORD.iter_unpack(self._map[offset:offset + (block_end - start) * _RECORD.size])
+            start = block_end
+
+    def _start_block(self, index, use_checkpoints=True):
+        if not use_checkpoints:
+            return 0
+        return min(index // self.checkpoint_interval, self.num_checkpoints - 1)
+
+    def states_at(self, index, use_checkpoints=True):
+        """Packed rod states after the first `index` records, as a bytearray.
+
+        Starts from the nearest checkpoint at or before `index`, so reaching any
+        point costs at most one checkpoint interval of records. With
+        use_checkpoints=False every record from the start is applied.
+        """
+        if not 0 <= index <= self.num_records:
+            raise IndexError("Record index out of range")
+        block = self._start_block(index, use_checkpoints)
+        states = bytearray(self.checkpoint(block))
+        next_states = _get_next_states()
+        slots_per_state = len(_BEAD_SLOTS)
+        for rod_index, bead_type, bead_index, flags in self._iter_raw(block * self.checkpoint_interval, index):
+            if flags & FLAG_STATE:
+                states[rod_index] = bead_type
+            else:
+                slot = bead_index + NUM_HEAVEN_BEADS if bead_type else bead_index
+                states[rod_index] = next_states[states[rod_index] * slots_per_state + slot]
+        return states
+
+    def replay(self, stop=None, use_checkpoints=True):
+        """Returns a fresh Abacus in the state after `stop` records (default: all of them).
+
+        The time taken is kept in `last_replay_seconds` and the number of records
+        applied in `last_replay_records`.
+        """
+        stop = self.num_records if stop is None else stop
+        start_time = time.perf_counter()
+        abacus = Abacus(self.num_rods)
+        abacus._load_states(self.states_at(stop, use_checkpoints))
+        self.last_replay_seconds = time.perf_counter() - start_time
+        self.last_replay_records = stop - self._start_block(stop, use_checkpoints) * self.checkpoint_interval
+        return abacus
+
+
+_next_states = None # Built on first use by _get_next_states()
+
+
+def _get_next_states():
+    # Flat copy of the transition table's new states, indexed by state * 7 + bead slot
+    global _next_states
+    if _next_states is None:
+        table = _get_transition_table()
+        _next_states = bytes(table[state][slot][0]
+                             for state in range(NUM_ROD_STATES) for slot in range(len(_BEAD_SLOTS)))
+    return _next_states
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m abacus.eventlog",
+                                     description="Inspect or replay an abacus event log")
+    parser.add_argument("command", choices=("info", "replay"))
+    parser.add_argument("path")
+    parser.add_argument("--to", type=int, default=None, help="replay only the first N records")
+    parser.add_argument("--no-checkpoints", action="store_true",
+                        help="apply every record from the start instead of jumping to a checkpoint")
+    args = parser.parse_args(argv)
+
+    with EventLogReader(args.path) as log:
+        if args.command == "info":
+            print(f"rods: {log.num_rods}")
+            print(f"records: {log.num_records}")
+            print(f"checkpoints: {log.num_checkpoints} (every {log.checkpoint_interval} records)")
+            return 0
+        stop = log.num_records if args.to is None else args.to
+        abacus = log.replay(stop, use_checkpoints=not args.no_checkpoints)
+        applied, seconds = log.last_replay_records, log.last_replay_seconds
+        rate = applied / seconds if seconds else float("inf")
+        print(f"value: {abacus.get_value_str()}")
+        print(f"replayed {applied} records to record {stop} in {seconds * 1000:.3f} ms"
+              f" ({rate:,.0f} records/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
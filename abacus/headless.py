@@ -0,0 +1,179 @@
+"""Headless evaluation of abacus computations, one per input line.
+
+Each non-blank line is evaluated on a fresh Abacus and produces one output line
+with the resulting value, or "error: <message>". A line is either an expression
+of whole numbers joined by + and - ("1200 + 34 - 5"), or statements separated by
+semicolons ("set 1200; add 34; subtract 5; multiply 3; divide 4"). Division keeps
+the quotient. Lines starting with '#' are comments.
+
+With trace=True each computation instead streams one line per bead step, pulled
+from Abacus.iter_steps() as the output is written, followed by its result.
+
+Large inputs are split into chunks and evaluated on a process pool. Results are
+written in input order as soon as each chunk finishes, so output streams while
+later chunks are still running. This module must not import Qt.
+"""
+import os
+import re
+import sys
+from collections import deque
+from itertools import chain, islice
+
+from abacus.model import Abacus
+
+_TERM = re.compile(r"\s*([+-]?)\s*(\d+)\s*")
+_STATEMENT = re.compile(r"\s*(set|add|sub|subtract|mul|multiply|div|divide)\s+(\d+)\s*$", re.IGNORECASE)
+_ALIASES = {"sub": "subtract", "mul": "multiply", "div": "divide"}
+
+
+# Bead positions as shown in a trace: heaven beads count when down, earth beads when up
+_POSITION_NAMES = {'heaven': ('up', 'down'), 'earth': ('down', 'up')}
+
+
+def _expression_operations(expression):
+    position = 0
+    first = True
+    while position < len(expression):
+        match = _TERM.match(expression, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"cannot parse {expression.strip()!r}")
+        sign, number = match.groups()
+        if first and not sign:
+            yield "set", int(number) # A leading bare number sets the abacus
+        elif not sign: # "1 2" is not a sum
+            raise ValueError(f"cannot parse {expression.strip()!r}")
+        elif sign == "-":
+            yield "subtract", int(number)
+        else:
+            yield "add", int(number)
+        first = False
+        position = match.end()
+
+
+def iter_operations(line):
+    """Yields the (operation, n) pairs of one input line, as Abacus.iter_steps() takes them."""
+    for statement in line.split(";"):
+        if not statement.strip():
+            continue
+        match = _STATEMENT.match(statement)
+        if match is None:
+            yield from _expression_operations(statement)
+            continue
+        operation = match.group(1).lower()
+        yield _ALIASES.get(operation, operation), int(match.group(2))
+
+
+def evaluate_line(line, num_rods=13):
+    """Evaluates one input line on a fresh abacus; returns the output line."""
+    abacus = Abacus(num_rods)
+    try:
+        for operation, number in iter_operations(line):
+            if operation == "set":
+                abacus.set_value(number, record_changes=False)
+            elif operation == "add":
+                abacus.add(number, record_changes=False)
+            elif operation == "subtract":
+                abacus.subtract(number, record_changes=False)
+            elif operation == "multiply":
+                abacus.multiply(number, record_changes=False)
+            else:
+                abacus.divide(number, record_changes=False)
+    except ValueError as e:
+        return f"error: {e}"
+    return abacus.get_value_str()
+
+
+def _format_step(rod_index, changes, carry_info):
+    moves = ", ".join(f"{bead_type} {bead_index} {_POSITION_NAMES[bead_type][position]}"
+                      for bead_type, bead_index, position in changes)
+    text = f"  rod {rod_index}: {moves or 'no bead moves'}"
+    if carry_info is not None:
+        text += f"; {'borrow from' if carry_info[3] == 'rod_10_borrow' else 'carry to'} rod {carry_info[0]}"
+    return text
+
+
+def trace_line(line, num_rods=13):
+    """Yields a '# operation' line and its bead steps for each operation, then the result.
+
+    Steps are produced lazily, so memory stays constant however many rods a
+    cascade crosses.
+    """
+    abacus = Abacus(num_rods)
+    try:
+        for operation in iter_operations(line):
+            yield f"# {operation[0]} {operation[1]}"
+            for step in abacus.iter_steps(operation):
+                yield _format_step(*step)
+    except ValueError as e:
+        yield f"error: {e}"
+        return
+    yield abacus.get_value_str()
+
+
+def evaluate_chunk(lines, num_rods=13):
+    """Worker entry point: evaluates a list of lines, keeping their order."""
+    return [evaluate_line(line, num_rods) for line in lines]
+
+
+def _read_chunks(lines, chunk_size):
+    lines = (line for line in lines if line.strip() and not line.lstrip().startswith("#"))
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_results(lines, num_rods=13, workers=None, chunk_size=1000, trace=False):
+    """Yields one result per computation line, in input order.
+
+    With more than one worker, at most two chunks per worker are in flight, so
+    memory stays bounded however long the input is. Traces always run in-process
+    so their step lines stream instead of piling up in a worker's chunk result.
+    """
+    if trace:
+        for chunk in _read_chunks(lines, chunk_size):
+            for line in chunk:
+                yield from trace_line(line, num_rods)
+        return
+    workers = workers or os.cpu_count() or 1
+    chunks = _read_chunks(lines, chunk_size)
+    if workers == 1:
+        for chunk in chunks:
+            yield from evaluate_chunk(chunk, num_rods)
+        return
+
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
+        return
+    second_chunk = next(chunks, None)
+    if second_chunk is None:
+        # Input fits in one chunk; a pool would only add startup cost
+        yield from evaluate_chunk(first_chunk, num_rods)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor # Only large inputs pay for the pool import
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for chunk in chain((first_chunk, second_chunk), chunks):
+            in_flight.append(executor.submit(evaluate_chunk, chunk, num_rods))
+            if len(in_flight) >= 2 * workers:
+                yield from in_flight.popleft().result() # Oldest first keeps output in order
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
+def run_headless(input_path="-", num_rods=13, workers=None, chunk_size=1000, output=None, trace=False):
+    """Evaluates every line of `input_path` ('-' for stdin) and writes results to `output`."""
+    output = output or sys.stdout
+    stream = sys.stdin if input_path == "-" else open(input_path, encoding="utf-8")
+    try:
+        for result in iter_results(stream, num_rods=num_rods, workers=workers, chunk_size=chunk_size,
+                                   trace=trace):
+            output.write(result + "\n")
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    output.flush()
+    return 0
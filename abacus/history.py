@@ -0,0 +1,188 @@
+"""Undo/redo history for an Abacus, stored as per-rod bead deltas.
+
+History attaches to an Abacus as a recorder (see Abacus.add_recorder()) and
+turns every rod write into one packed delta: (rod_index << 7) | (old ^ new),
+where old and new are 7-bit rod states, so the mask's set bits are exactly the
+(bead_type, bead_index) beads that moved. XOR-ing the same deltas back in
+undoes an operation, and XOR-ing them again redoes it. An operation is
+everything between two Abacus._begin_operation() calls: a bead click with its
+whole carry cascade, one add(), one set_value() and so on.
+
+Every `snapshot_interval` operations the packed state of all rods is kept as
+well, so goto() can reach a distant point from the nearest snapshot instead of
+applying every delta in between. When the history grows past `max_bytes`, the
+oldest operations are evicted.
+"""
+from array import array
+
+DEFAULT_SNAPSHOT_INTERVAL = 256 # Operations between full snapshots
+DEFAULT_MAX_BYTES = 16 << 20 # Memory cap for deltas, operation index and snapshots
+
+_MASK_BITS = 7 # Rod state bits below the rod index in a packed delta
+_MASK = (1 << _MASK_BITS) - 1
+_ITEM_SIZE = array('Q').itemsize
+
+
+class History:
+    """Undo/redo for one Abacus. Operations are numbered from 0 since the history started."""
+
+    def __init__(self, abacus, snapshot_interval=DEFAULT_SNAPSHOT_INTERVAL, max_bytes=DEFAULT_MAX_BYTES):
+        self.abacus = abacus
+        self.snapshot_interval = snapshot_interval
+        self.max_bytes = max_bytes
+        self._shadow = bytearray(abacus._state) # Rod states as of the last recorded write
+        self._deltas = array('Q') # Packed deltas of the retained operations, in write order
+        self._starts = array('Q') # Index in _deltas where each retained operation starts
+        self._base = 0 # Number of the oldest retained operation; older ones were evicted
+        self._position = 0 # Operations currently applied; undo() steps back from here
+        self._snapshots = {} # Operation count -> packed rod states after that many operations
+        self._snapshot_bytes = 0
+        self._new_operation = True # The next delta starts a new operation
+        self._applying = False # Set while undo/redo write to the abacus, so they are not recorded
+        abacus.add_recorder(self)
+
+    def close(self):
+        """Stops recording; the abacus keeps its current state."""
+        self.abacus.remove_recorder(self)
+
+    @property
+    def position(self):
+        return self._position
+
+    @property
+    def oldest(self):
+        """Number of the oldest operation that can still be undone."""
+        return self._base
+
+    @property
+    def newest(self):
+        """Operation count after redoing everything."""
+        return self._base + len(self._starts)
+
+    def can_undo(self):
+        return self._position > self._base
+
+    def can_redo(self):
+        return self._position < self.newest
+
+    def memory_bytes(self):
+        return (len(self._deltas) + len(self._starts)) * _ITEM_SIZE + self._snapshot_bytes + len(self._shadow)
+
+    # Recorder interface, called by the Abacus
+
+    def begin_operation(self):
+        if not self._applying:
+            self._new_operation = True
+
+    def record_move(self, rod_index, bead_type, bead_index, carry=False):
+        self.record_state(rod_index, self.abacus._state[rod_index])
+
+    def record_state(self, rod_index, state):
+        if self._applying:
+            return
+        mask = self._shadow[rod_index] ^ state
+        if not mask:
+            return
+        if self._new_operation:
+            self._start_operation()
+        self._shadow[rod_index] = state
+        self._deltas.append(rod_index << _MASK_BITS | mask)
+        if self.memory_bytes() > self.max_bytes:
+            self._evict()
+
+    def _start_operation(self):
+        self._new_operation = False
+        if self._position < self.newest: # New work after undo() drops the redo branch
+            keep = self._position - self._base
+            del self._deltas[self._starts[keep]:]
+            del self._starts[keep:]
+            self._drop_snapshots(lambda number: number > self._position)
+        if self._position % self.snapshot_interval == 0 and self._position not in self._snapshots:
+            # The shadow still holds the state before this first write
+            self._snapshots[self._position] = bytes(self._shadow)
+            self._snapshot_bytes += len(self._shadow)
+        self._starts.append(len(self._deltas))
+        self._position += 1
+
+    def _drop_snapshots(self, predicate):
+        for number in [number for number in self._snapshots if predicate(number)]:
+            self._snapshot_bytes -= len(self._snapshots.pop(number))
+
+    def _evict(self):
+        # Drop the oldest operations until under 3/4 of the cap, so eviction is amortized.
+        # The operation being recorded (position - 1) and the redo branch are kept.
+        excess = self.memory_bytes() - self.max_bytes * 3 // 4
+        droppable = self._position - 1 - self._base
+        drop = 0
+        while drop < droppable and excess > 0:
+            excess -= (1 + self._starts[drop + 1] - self._starts[drop]) * _ITEM_SIZE
+            snapshot = self._snapshots.get(self._base + drop) # Unreachable once that operation goes
+            if snapshot is not None:
+                excess -= len(snapshot)
+            drop += 1
+        if not drop:
+            return
+        cut = self._starts[drop]
+        del self._deltas[:cut]
+        self._starts = array('Q', (start - cut for start in self._starts[drop:]))
+        self._base += drop
+        self._drop_snapshots(lambda number: number < self._base)
+
+    # Navigation
+
+    def undo(self):
+        """Reverts the latest operation; returns the changed rod indices, or None if there is none."""
+        if not self.can_undo():
+            return None
+        return self.goto(self._position - 1)
+
+    def redo(self):
+        """Re-applies the next undone operation; returns the changed rod indices, or None."""
+        if not self.can_redo():
+            return None
+        return self.goto(self._position + 1)
+
+    def goto(self, number):
+        """Moves to the state after `number` operations; returns the sorted changed rod indices.
+
+        Starts from whichever is cheaper: the current state or the nearest snapshot,
+        where loading a snapshot costs about as much as applying num_rods deltas.
+        """
+        if not self._base <= number <= self.newest:
+            raise IndexError("Operation is not in the history")
+        target = self._delta_index(number)
+        start_number = self._position
+        cost = abs(target - self._delta_index(self._position))
+        for snapshot_number in self._snapshots:
+            snapshot_cost = len(self._shadow) + abs(target - self._delta_index(snapshot_number))
+            if snapshot_cost < cost:
+                start_number, cost = snapshot_number, snapshot_cost
+
+        shadow = self._shadow
+        start = self._delta_index(start_number)
+        deltas = self._deltas[min(start, target):max(start, target)]
+        if start_number != self._position:
+            shadow[:] = self._snapshots[start_number]
+            candidates = range(len(shadow))
+        else:
+            candidates = sorted({delta >> _MASK_BITS for delta in deltas})
+        # XOR is order-independent, so undo and redo apply the same slice of deltas
+        for delta in deltas:
+            shadow[delta >> _MASK_BITS] ^= delta & _MASK
+
+        abacus = self.abacus
+        changed = [rod_index for rod_index in candidates if shadow[rod_index] != abacus._state[rod_index]]
+        self._applying = True
+        try:
+            abacus._begin_operation() # Other recorders (an event log) still see the writes
+            for rod_index in changed:
+                abacus._set_rod_state(rod_index, shadow[rod_index])
+        finally:
+            self._applying = False
+        self._position = number
+        self._new_operation = True
+        return changed
+
+    def _delta_index(self, number):
+        index = number - self._base
+        return self._starts[index] if index < len(self._starts) else len(self._deltas)
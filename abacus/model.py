@@ -0,0 +1,887 @@
+import operator
+
+from abacus.stats import Stats
+
+# Rod state encoding used by the transition table: one bit per bead, set when the
+# bead is in its counting position (heaven bead down / earth bead up).
+# Bits 0-1 hold heaven beads 0-1 and bits 2-6 hold earth beads 0-4, giving
+# 2 ** 7 = 128 possible rod states.
+NUM_HEAVEN_BEADS = 2
+NUM_EARTH_BEADS = 5
+NUM_ROD_STATES = 1 << (NUM_HEAVEN_BEADS + NUM_EARTH_BEADS)
+
+# Maps a clicked bead to its column in the transition table.
+_BEAD_SLOTS = {("heaven", i): i for i in range(NUM_HEAVEN_BEADS)}
+_BEAD_SLOTS.update({("earth", i): NUM_HEAVEN_BEADS + i for i in range(NUM_EARTH_BEADS)})
+
+_transition_table = None # Built on first use by _get_transition_table()
+
+
+def _encode_rod(rod):
+    """Packs a rod dict into its 7-bit state."""
+    state = 0
+    for i, bead_pos in enumerate(rod['heaven_beads']):
+        state |= bead_pos << i
+    for i, bead_pos in enumerate(rod['earth_beads']):
+        state |= bead_pos << (NUM_HEAVEN_BEADS + i)
+    return state
+
+
+def _decode_rod(state):
+    """Unpacks a 7-bit rod state into a fresh rod dict."""
+    return {
+        'heaven_beads': [(state >> i) & 1 for i in range(NUM_HEAVEN_BEADS)],
+        'earth_beads': [(state >> (NUM_HEAVEN_BEADS + i)) & 1 for i in range(NUM_EARTH_BEADS)]
+    }
+
+
+def _get_rod_value(rod):
+    rod_value = 0
+    # Calculate value from heaven beads
+    for bead_pos in rod['heaven_beads']:
+        if bead_pos == 1: # Bead is down
+            rod_value += 5
+    # Calculate value from earth beads
+    for bead_pos in rod['earth_beads']:
+        if bead_pos == 1: # Bead is up
+            rod_value += 1
+    return rod_value
+
+
+def _simulate_move(rod, bead_type, bead_index):
+    """Reference branching engine: simulates a click on a copy of `rod`.
+
+    Returns the ordered list of (bead_type, bead_index, new_position) changes and
+    whether the rod overflowed and carries 1 to the next rod. The transition table
+    below is generated from this function, so the two always agree.
+    """
+    carries = False # Set when the rod overflows and must carry to the next rod
+    changes = [] # List to store bead changes for the current rod
+
+    # Create a mutable copy of the rod state to apply changes to for simulation
+    current_simulated_rod = {
+        'heaven_beads': list(rod['heaven_beads']),
+        'earth_beads': list(rod['earth_beads'])
+    }
+
+    if bead_type == "heaven":
+        if not (0 <= bead_index < 2):
+            raise IndexError("Heaven bead index out of bounds (0 or 1)")
+        
+        # Get current state of the clicked heaven bead from the actual rod (initial click)
+        current_bead_pos = rod['heaven_beads'][bead_index]
+        
+        if bead_index == 1: # Bottom heaven bead (value 5) was clicked
+            if current_simulated_rod['heaven_beads'][1] == 0: # Bottom bead is currently UP (0), moving DOWN (1) - ADDITION
+                changes.append(("heaven", 1, 1)) # Move bottom heaven bead down
+                current_simulated_rod['heaven_beads'][1] = 1
+                # If top heaven bead is down, and bottom is now down, it's a 10. Reset and carry.
+                if current_simulated_rod['heaven_beads'][0] == 1:
+                    for i in range(2):
+                        changes.append(("heaven", i, 0)) # Reset both heaven beads
+                        current_simulated_rod['heaven_beads'][i] = 0
+                    carries = True
+            else: # Bottom bead is currently DOWN (1), moving UP (0) - SUBTRACTION
+                changes.append(("heaven", 1, 0)) # Move bottom heaven bead up
+                current_simulated_rod['heaven_beads'][1] = 0
+                # Ensure top heaven bead is up if it was down (shouldn't happen with correct logic, but for safety)
+                if current_simulated_rod['heaven_beads'][0] == 1:
+                    changes.append(("heaven", 0, 0))
+                    current_simulated_rod['heaven_beads'][0] = 0
+
+        elif bead_index == 0: # Top heaven bead (value 5) was clicked
+            # Check current state of both heaven beads
+            top_bead_is_up = current_simulated_rod['heaven_beads'][0] == 0
+            bottom_bead_is_up = current_simulated_rod['heaven_beads'][1] == 0
+
+            if top_bead_is_up and bottom_bead_is_up: # Both are up (value 0), clicking top implies adding 10
+                # Temporarily move both down for visual effect (before reset)
+                changes.append(("heaven", 0, 1))
+                current_simulated_rod['heaven_beads'][0] = 1
+                changes.append(("heaven", 1, 1))
+                current_simulated_rod['heaven_beads'][1] = 1
+
+                # Then, reset both and trigger carry
+                for i in range(2):
+                    changes.append(("heaven", i, 0)) # Reset both heaven beads
+                    current_simulated_rod['heaven_beads'][i] = 0
+                carries = True
+
+            elif top_bead_is_up and not bottom_bead_is_up: # Top is up, bottom is down (value 5), clicking top implies adding 5 to make 10
+                changes.append(("heaven", 0, 1)) # Move top heaven bead down
+                current_simulated_rod['heaven_beads'][0] = 1
+                # Now both are down, so it's a 10. Reset and carry.
+                for i in range(2):
+                    changes.append(("heaven", i, 0)) # Reset both heaven beads
+                    current_simulated_rod['heaven_beads'][i] = 0
+                carries = True
+
+            elif not top_bead_is_up: # Top bead is currently DOWN (1), moving UP (0) - SUBTRACTION
+                changes.append(("heaven", 0, 0)) # Move top heaven bead up
+                current_simulated_rod['heaven_beads'][0] = 0
+
+    elif bead_type == "earth":
+        if not (0 <= bead_index < 5):
+            raise IndexError("Earth bead index out of bounds (0-4)")
+        
+        # Determine the new state for the clicked bead
+        current_pos = rod['earth_beads'][bead_index]
+        new_pos = 1 - current_pos # Toggle 0 to 1, 1 to 0
+
+        if new_pos == 1: # Moving earth bead UP
+            # All beads from clicked bead's position to the top (index 0) move up
+            for i in range(bead_index + 1):
+                if current_simulated_rod['earth_beads'][i] == 0: # Only add change if bead actually moves
+                    changes.append(("earth", i, 1))
+                    current_simulated_rod['earth_beads'][i] = 1
+        else: # Moving earth bead DOWN
+            # All beads from clicked bead's position to the bottom (index 4) move down
+            for i in range(bead_index, 5):
+                if current_simulated_rod['earth_beads'][i] == 1: # Only add change if bead actually moves
+                    changes.append(("earth", i, 0))
+                    current_simulated_rod['earth_beads'][i] = 0
+        
+        # Earth Bead Carry (Value 5): When all 5 earth beads are up
+        if sum(current_simulated_rod['earth_beads']) == 5:
+            # If bottom heaven bead is up, move it down and reset earth beads
+            if current_simulated_rod['heaven_beads'][1] == 0: # Check current state of heaven bead
+                # Reset all earth beads to down (explicitly set all to 0)
+                for i in range(5):
+                    changes.append(("earth", i, 0))
+                    current_simulated_rod['earth_beads'][i] = 0
+                changes.append(("heaven", 1, 1)) # Move bottom heaven bead down
+                current_simulated_rod['heaven_beads'][1] = 1
+                changes.append(("heaven", 0, 0)) # Ensure top heaven bead is up
+                current_simulated_rod['heaven_beads'][0] = 0
+            else: # If bottom heaven bead is already down, and earth beads sum to 5, it's a carry of 10
+                # This means the rod value is 5 (heaven) + 5 (earth) = 10
+                # Reset current rod and indicate a carry to the next rod
+                for i in range(2):
+                    changes.append(("heaven", i, 0))
+                    current_simulated_rod['heaven_beads'][i] = 0
+                for i in range(5):
+                    changes.append(("earth", i, 0))
+                    current_simulated_rod['earth_beads'][i] = 0
+                carries = True # Carry 1 to the next rod
+
+    else:
+        raise ValueError("Invalid bead_type. Must be 'heaven' or 'earth'.")
+
+    # After any bead movement, check for rod carry (value 10 or more)
+    # This check should only trigger if the value *increases* to 10 or more
+    # and hasn't already been handled by the earth bead carry logic above.
+    
+    current_rod_value = _get_rod_value(current_simulated_rod)
+
+    # If the current rod value is 10 or more, and it wasn't a direct heaven_10_carry from top heaven bead click
+    # and it wasn't already handled by the earth bead carry (which sets carries)
+    if current_rod_value >= 10 and not carries:
+        # Reset current rod (explicitly set all to 0)
+        for i in range(2):
+            changes.append(("heaven", i, 0))
+            current_simulated_rod['heaven_beads'][i] = 0
+        for i in range(5):
+            changes.append(("earth", i, 0))
+            current_simulated_rod['earth_beads'][i] = 0
+        # Indicate a carry to the next rod
+        carries = True # Reported as a carry to the next rod
+    
+    return changes, carries
+
+
+def _build_transition_table():
+    """Runs the branching engine once for every (rod state, clicked bead) pair.
+
+    Entry [state][slot] is (new_state, changes, carries), with `changes` stored as a
+    tuple so the shared table cannot be mutated by callers.
+    """
+    table = []
+    for state in range(NUM_ROD_STATES):
+        row = [None] * len(_BEAD_SLOTS)
+        for (bead_type, bead_index), slot in _BEAD_SLOTS.items():
+            rod = _decode_rod(state)
+            changes, carries = _simulate_move(rod, bead_type, bead_index)
+            for changed_type, changed_index, new_position in changes:
+                rod[f'{changed_type}_beads'][changed_index] = new_position
+            row[slot] = (_encode_rod(rod), tuple(changes), carries)
+        table.append(tuple(row))
+    return tuple(table)
+
+
+def _get_transition_table():
+    global _transition_table
+    if _transition_table is None:
+        _transition_table = _build_transition_table()
+    return _transition_table
+
+
+# Value of every packed rod state (heaven beads count 5, earth beads count 1).
+_ROD_VALUES = tuple(
+    5 * bin(state & 0b11).count("1") + bin(state >> NUM_HEAVEN_BEADS).count("1")
+    for state in range(NUM_ROD_STATES)
+)
+
+# bytes.translate() table from packed rod state to rod value
+_ROD_VALUE_TABLE = bytes(_ROD_VALUES) + bytes(256 - NUM_ROD_STATES)
+
+# Digits are converted to ints in chunks well below Python's int/str conversion limit
+# (sys.get_int_max_str_digits(), 4300 by default) and combined by divide and conquer.
+_DIGIT_CHUNK = 1000
+_DIGIT_CHARS = bytes.maketrans(bytes(range(10)), b'0123456789')
+_powers_of_ten = {}
+
+
+def _pow10(exponent):
+    power = _powers_of_ten.get(exponent)
+    if power is None:
+        power = _powers_of_ten[exponent] = 10 ** exponent
+    return power
+
+
+def _digits_to_int(digits):
+    """Converts per-rod digits (most significant first, each 0-15) into an int."""
+    if len(digits) <= _DIGIT_CHUNK:
+        if max(digits, default=0) <= 9:
+            return int(digits.translate(_DIGIT_CHARS) or b'0')
+        value = 0
+        for digit in digits: # Rods holding 10 or more (mid-carry states) need Horner's rule
+            value = value * 10 + digit
+        return value
+    low_len = len(digits) // 2
+    high = _digits_to_int(digits[:-low_len])
+    return high * _pow10(low_len) + _digits_to_int(digits[-low_len:])
+
+
+def _digits_to_str(digits):
+    """Decimal string for per-rod digits without going through int (no size limit)."""
+    if max(digits, default=0) > 9:
+        # Fold rod values of 10 or more into the rod on their left first
+        digits = bytearray(digits)
+        carry = 0
+        for i in range(len(digits) - 1, -1, -1):
+            carry, digits[i] = divmod(digits[i] + carry, 10)
+        if carry:
+            digits[0:0] = bytes((carry,))
+    return digits.translate(_DIGIT_CHARS).lstrip(b'0').decode() or '0'
+
+
+_DIGIT_VALUES = bytes.maketrans(b'0123456789', bytes(range(10)))
+_SMALL_OPERAND = 10 ** 18
+
+
+def _int_to_digits(n):
+    """Digits of a non-negative int as bytes of values 0-9, most significant first."""
+    if n < _pow10(_DIGIT_CHUNK):
+        return str(n).encode().translate(_DIGIT_VALUES)
+    low_len = _DIGIT_CHUNK
+    while _pow10(2 * low_len) <= n:
+        low_len *= 2
+    high, low = divmod(n, _pow10(low_len))
+    return _int_to_digits(high) + _int_to_digits(low).rjust(low_len, b'\0')
+
+
+# Standard bead setting for each digit 0-9: the bottom heaven bead (index 1) shows
+# the 5 and earth beads are pushed up from the beam (index 0) for the remainder.
+_DIGIT_STATES = bytes(
+    (0b10 if digit >= 5 else 0) | (((1 << (digit % 5)) - 1) << NUM_HEAVEN_BEADS)
+    for digit in range(10)
+)
+_digit_changes = None # Built on first use by _get_digit_changes()
+
+
+def _get_digit_changes():
+    """Entry [state][digit] lists the bead changes that turn `state` into _DIGIT_STATES[digit]."""
+    global _digit_changes
+    if _digit_changes is None:
+        table = []
+        for state in range(NUM_ROD_STATES):
+            row = []
+            for target in _DIGIT_STATES:
+                changes = []
+                for bead_type, (offset, count) in (("heaven", _BEAD_GROUPS['heaven_beads']), ("earth", _BEAD_GROUPS['earth_beads'])):
+                    for i in range(count):
+                        bit = 1 << (offset + i)
+                        if (state ^ target) & bit:
+                            changes.append((bead_type, i, 1 if target & bit else 0))
+                row.append(tuple(changes))
+            table.append(tuple(row))
+        _digit_changes = tuple(table)
+    return _digit_changes
+
+
+# Bit offset and bead count of each bead group inside a packed rod state.
+_BEAD_GROUPS = {
+    'heaven_beads': (0, NUM_HEAVEN_BEADS),
+    'earth_beads': (NUM_HEAVEN_BEADS, NUM_EARTH_BEADS),
+}
+
+
+class _BeadView:
+    """List-like view of one bead group ('heaven_beads' or 'earth_beads') of a packed rod."""
+    __slots__ = ('_abacus', '_rod_index', '_offset', '_count')
+
+    def __init__(self, abacus, rod_index, offset, count):
+        self._abacus = abacus
+        self._rod_index = rod_index
+        self._offset = offset
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def _bit(self, bead_index):
+        if bead_index < 0:
+            bead_index += self._count
+        if not (0 <= bead_index < self._count):
+            raise IndexError("Bead index out of range")
+        return 1 << (self._offset + bead_index)
+
+    def __getitem__(self, bead_index):
+        if isinstance(bead_index, slice):
+            return list(self)[bead_index]
+        return 1 if self._abacus._state[self._rod_index] & self._bit(bead_index) else 0
+
+    def __setitem__(self, bead_index, bead_pos):
+        bit = self._bit(bead_index)
+        state = self._abacus._state[self._rod_index]
+        self._abacus._begin_operation()
+        self._abacus._set_rod_state(self._rod_index, state | bit if bead_pos else state & ~bit)
+
+    def __iter__(self):
+        state = self._abacus._state[self._rod_index] >> self._offset
+        for i in range(self._count):
+            yield (state >> i) & 1
+
+    def __eq__(self, other):
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class _RodView:
+    """Dict-like view of one packed rod, keeping the old rods[i]['heaven_beads'] access working."""
+    __slots__ = ('_abacus', '_rod_index')
+
+    def __init__(self, abacus, rod_index):
+        self._abacus = abacus
+        self._rod_index = rod_index
+
+    def __getitem__(self, key):
+        offset, count = _BEAD_GROUPS[key]
+        return _BeadView(self._abacus, self._rod_index, offset, count)
+
+    def __setitem__(self, key, bead_positions):
+        offset, count = _BEAD_GROUPS[key]
+        if len(bead_positions) != count:
+            raise ValueError(f"{key} expects {count} bead positions")
+        mask = ((1 << count) - 1) << offset
+        state = self._abacus._state[self._rod_index] & ~mask
+        for i, bead_pos in enumerate(bead_positions):
+            if bead_pos:
+                state |= 1 << (offset + i)
+        self._abacus._begin_operation() # Its own undo step, like a single bead write
+        self._abacus._set_rod_state(self._rod_index, state)
+
+    def keys(self):
+        return _BEAD_GROUPS.keys()
+
+    def __iter__(self):
+        return iter(_BEAD_GROUPS)
+
+    def __eq__(self, other):
+        try:
+            return {key: list(self[key]) for key in _BEAD_GROUPS} == {key: list(other[key]) for key in _BEAD_GROUPS}
+        except (TypeError, KeyError):
+            return NotImplemented
+
+    def __repr__(self):
+        return repr({key: list(self[key]) for key in _BEAD_GROUPS})
+
+
+class _RodList:
+    """Sequence of rod views over the abacus' packed state buffer."""
+    __slots__ = ('_abacus',)
+
+    def __init__(self, abacus):
+        self._abacus = abacus
+
+    def __len__(self):
+        return self._abacus.num_rods
+
+    def __getitem__(self, rod_index):
+        if isinstance(rod_index, slice):
+            return [_RodView(self._abacus, i) for i in range(*rod_index.indices(len(self)))]
+        if rod_index < 0:
+            rod_index += len(self)
+        if not (0 <= rod_index < len(self)):
+            raise IndexError("Rod index out of range")
+        return _RodView(self._abacus, rod_index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield _RodView(self._abacus, i)
+
+
+class _RecorderGroup(list):
+    """Forwards recorder calls to several recorders (see Abacus.add_recorder())."""
+
+    def begin_operation(self):
+        for recorder in self:
+            recorder.begin_operation()
+
+    def record_move(self, rod_index, bead_type, bead_index, carry=False):
+        for recorder in self:
+            recorder.record_move(rod_index, bead_type, bead_index, carry)
+
+    def record_state(self, rod_index, state):
+        for recorder in self:
+            recorder.record_state(rod_index, state)
+
+
+class Abacus:
+    def __init__(self, num_rods=13, use_transition_table=True):
+        self.num_rods = num_rods
+        # Table mode resolves every click with a single lookup; the branching engine
+        # (_simulate_move) is kept as the reference implementation.
+        self.use_transition_table = use_transition_table
+        # Each rod has 2 heaven beads and 5 earth beads, packed into one byte per rod
+        # (see the rod state encoding at the top of this module).
+        # Heaven beads: 0 = up (value 0), 1 = down (value 5)
+        # Earth beads: 0 = down (value 0), 1 = up (value 1)
+        self._state = bytearray(num_rods) # All beads start in their 'zero' position
+        # Per-rod digit cache kept in step with _state, plus the total value built from it
+        # on demand. _value is None whenever a rod's digit changed since the last build.
+        self._digits = bytearray(num_rods)
+        self._value = 0
+        # rods[i]['heaven_beads'][j] style access is served by lightweight views over _state
+        self.rods = _RodList(self)
+        # Optional observer (abacus.eventlog.EventLogWriter, abacus.history.History) told
+        # when an operation starts and about every bead move and other rod write after it
+        # is applied. None keeps the hot paths free; see add_recorder().
+        self.recorder = None
+        # Optional counters (abacus.stats.Stats), off by default; see enable_stats()
+        self.stats = None
+
+    def enable_stats(self):
+        """Starts collecting counters (once) and returns the live Stats object."""
+        if self.stats is None:
+            self.stats = Stats()
+        return self.stats
+
+    def add_recorder(self, recorder):
+        """Attaches an observer with begin_operation(), record_move() and record_state()."""
+        if self.recorder is None:
+            self.recorder = recorder
+        elif isinstance(self.recorder, _RecorderGroup):
+            self.recorder.append(recorder)
+        else:
+            self.recorder = _RecorderGroup((self.recorder, recorder))
+
+    def remove_recorder(self, recorder):
+        if self.recorder is recorder:
+            self.recorder = None
+        elif isinstance(self.recorder, _RecorderGroup) and recorder in self.recorder:
+            self.recorder.remove(recorder)
+            if len(self.recorder) == 1:
+                self.recorder = self.recorder[0]
+
+    def _begin_operation(self):
+        # Marks the start of a user-level operation; its carry steps and rod writes follow
+        if self.recorder is not None:
+            self.recorder.begin_operation()
+
+    def reset(self):
+        self._begin_operation()
+        old_states = bytes(self._state) if self.recorder is not None else None
+        self._state[:] = bytes(self.num_rods)
+        self._digits[:] = bytes(self.num_rods)
+        self._value = 0
+        if old_states is not None:
+            self._record_rod_states(old_states)
+
+    def _set_rod_state(self, rod_index, state, record=True):
+        self._state[rod_index] = state
+        digit = _ROD_VALUES[state]
+        if self._digits[rod_index] != digit:
+            self._digits[rod_index] = digit
+            self._value = None # Rebuilt lazily by get_value()
+        if record and self.recorder is not None:
+            self.recorder.record_state(rod_index, state)
+
+    def _load_states(self, states):
+        """Replaces the packed state of every rod at once (num_rods bytes)."""
+        self._begin_operation()
+        old_states = bytes(self._state) if self.recorder is not None else None
+        self._state[:] = states
+        self._digits[:] = self._state.translate(_ROD_VALUE_TABLE)
+        self._value = None
+        if old_states is not None:
+            self._record_rod_states(old_states)
+
+    def _record_rod_states(self, old_states):
+        # Bulk writes log one state record per rod that actually changed
+        state = self._state
+        for rod_index in range(self.num_rods):
+            if state[rod_index] != old_states[rod_index]:
+                self.recorder.record_state(rod_index, state[rod_index])
+
+    def get_value(self):
+        if self.stats is not None:
+            self.stats.get_value_calls += 1
+            if self._value is None:
+                self.stats.get_value_rebuilds += 1
+        if self._value is None:
+            self._value = _digits_to_int(self._digits)
+        return self._value
+
+    def get_value_str(self):
+        """Decimal string of the current value; works for any number of rods."""
+        if self._value is not None and self._value < _pow10(_DIGIT_CHUNK):
+            return str(self._value)
+        return _digits_to_str(self._digits)
+
+    def _get_rod_value(self, rod):
+        return _get_rod_value(rod)
+
+    def add(self, n, record_changes=True):
+        """Adds `n` across the rods in one right-to-left pass with carries.
+
+        Returns the change log: (rod_index, changes) pairs in the order the rods were
+        updated, each `changes` list in the same format as move_bead(). Returns None
+        when record_changes is False. Raises ValueError if the result does not fit
+        and TypeError if `n` is not an integer, before any rod changes.
+        """
+        n = operator.index(n) # A float would write its digits but leave _value fractional
+        if n < 0:
+            return self.subtract(-n, record_changes)
+        return self._apply_operand(n, 1, record_changes)
+
+    def subtract(self, n, record_changes=True):
+        """Subtracts `n` in one right-to-left pass with borrows; see add()."""
+        n = operator.index(n)
+        if n < 0:
+            return self.add(-n, record_changes)
+        return self._apply_operand(n, -1, record_changes)
+
+    def multiply(self, n, record_changes=True):
+        """Multiplies the value by `n`.
+
+        Computes the product directly and sets the rods to it, which leaves the same
+        bead state as the step-by-step iter_steps(('multiply', n)). Returns the change
+        log like set_value(); raises ValueError if the product does not fit.
+        """
+        n = operator.index(n)
+        return self.set_value(self._check_result(self.get_value() * n), record_changes)
+
+    def divide(self, n, record_changes=True):
+        """Divides the value by `n`, leaving the quotient on the rods.
+
+        Returns (remainder, change_log), where change_log is as for set_value().
+        Raises ValueError for a zero or negative divisor.
+        """
+        quotient, remainder = self._divmod(operator.index(n))
+        return remainder, self.set_value(quotient, record_changes)
+
+    def _check_result(self, result):
+        if result < 0:
+            raise ValueError("Result would be negative")
+        if result >= _pow10(self.num_rods):
+            raise ValueError("Result does not fit on the abacus")
+        return result
+
+    def _divmod(self, n):
+        if n == 0:
+            raise ValueError("Cannot divide by zero")
+        if n < 0:
+            raise ValueError("Cannot divide by a negative number")
+        return divmod(self.get_value(), n)
+
+    def _apply_operand(self, n, sign, record_changes):
+        # Operands that fit a machine word skip the chunked conversion (hot path for batch jobs)
+        operand = str(n).encode().translate(_DIGIT_VALUES) if n < _SMALL_OPERAND else _int_to_digits(n)
+        digits = self._digits
+        # First pass: work out the new digit of every rod the operand or a carry
+        # reaches, so an out-of-range result leaves the abacus untouched.
+        updates = []
+        carry = 0
+        rod_index = self.num_rods - 1
+        operand_index = len(operand) - 1
+        while operand_index >= 0 or carry:
+            if rod_index < 0:
+                if carry < 0 or (carry == 0 and sign < 0):
+                    raise ValueError("Result would be negative")
+                raise ValueError("Result does not fit on the abacus")
+            delta = carry
+            if operand_index >= 0:
+                delta += sign * operand[operand_index]
+                operand_index -= 1
+            if delta:
+                carry, digit = divmod(digits[rod_index] + delta, 10)
+                updates.append((rod_index, digit))
+            else:
+                carry = 0 # Operand digit and carry cancel out; this rod is left alone
+            rod_index -= 1
+
+        # Second pass: set each updated rod to the standard beads for its digit
+        self._begin_operation()
+        state = self._state
+        change_log = None
+        if record_changes:
+            change_log = []
+            digit_changes = _get_digit_changes()
+            for rod_index, digit in updates:
+                changes = digit_changes[state[rod_index]][digit]
+                if changes:
+                    change_log.append((rod_index, list(changes)))
+        for rod_index, digit in updates:
+            state[rod_index] = _DIGIT_STATES[digit]
+            digits[rod_index] = digit
+        if self._value is not None:
+            self._value += sign * n
+        if self.recorder is not None:
+            for rod_index, digit in updates:
+                self.recorder.record_state(rod_index, _DIGIT_STATES[digit])
+        return change_log
+
+    def set_value(self, n, record_changes=True):
+        """Sets every rod to the standard bead setting for the digits of `n`.
+
+        Returns the change log (right-to-left, as add() does) or None when
+        record_changes is False.
+        """
+        n = operator.index(n)
+        if not (0 <= n < _pow10(self.num_rods)):
+            raise ValueError("Value does not fit on the abacus")
+        target_digits = _int_to_digits(n).rjust(self.num_rods, b'\0')
+        target_states = target_digits.translate(_DIGIT_STATES + bytes(256 - len(_DIGIT_STATES)))
+        change_log = None
+        if record_changes:
+            change_log = []
+            digit_changes = _get_digit_changes()
+            state = self._state
+            for rod_index in range(self.num_rods - 1, -1, -1):
+                if state[rod_index] != target_states[rod_index]:
+                    change_log.append((rod_index, list(digit_changes[state[rod_index]][target_digits[rod_index]])))
+        self._begin_operation()
+        old_states = bytes(self._state) if self.recorder is not None else None
+        self._state[:] = target_states
+        self._digits[:] = target_digits
+        self._value = n
+        if old_states is not None:
+            self._record_rod_states(old_states)
+        return change_log
+
+    def move_bead(self, rod_index, bead_type, bead_index):
+        if not (0 <= rod_index < self.num_rods):
+            raise IndexError("Rod index out of bounds")
+        if self.stats is not None:
+            calls = self.stats.move_bead_calls
+            calls[bead_type] = calls.get(bead_type, 0) + 1
+
+        state = self._state[rod_index]
+        if self.use_transition_table:
+            slot = _BEAD_SLOTS.get((bead_type, bead_index))
+            if slot is None:
+                # Fall through to the branching engine for its error messages
+                changes, carries = _simulate_move(_decode_rod(state), bead_type, bead_index)
+            else:
+                _, changes, carries = _get_transition_table()[state][slot]
+                changes = list(changes) # Callers get their own copy of the shared entry
+        else:
+            changes, carries = _simulate_move(_decode_rod(state), bead_type, bead_index)
+
+        carry_info = (rod_index - 1, 'earth', 0, 'rod_10_carry') if carries else None
+        return changes, carry_info # Return changes and carry information
+
+    def apply_changes(self, rod_index, changes, record=True):
+        """Applies a move_bead() style change list to one rod."""
+        if record:
+            self._begin_operation()
+        state = self._state[rod_index]
+        for bead_type, bead_index, new_position in changes:
+            bit = 1 << (_BEAD_SLOTS[(bead_type, bead_index)])
+            state = state | bit if new_position else state & ~bit
+        self._set_rod_state(rod_index, state, record)
+
+    def apply_move(self, rod_index, bead_type, bead_index, carry=False):
+        """move_bead() followed by apply_changes(); returns the same (changes, carry_info).
+
+        `carry` marks the move as a carry step of an earlier move for the recorder.
+        """
+        changes, carry_info = self.move_bead(rod_index, bead_type, bead_index)
+        if not carry: # Carry steps belong to the move that started the cascade
+            self._begin_operation()
+        self.apply_changes(rod_index, changes, record=False)
+        if self.stats is not None:
+            self.stats.record_move(carry)
+        if self.recorder is not None:
+            self.recorder.record_move(rod_index, bead_type, bead_index, carry)
+        return changes, carry_info
+
+    def iter_steps(self, operation):
+        """Returns a generator that carries out `operation` one rod at a time.
+
+        `operation` is ('move', rod_index, bead_type, bead_index), ('add', n),
+        ('subtract', n), ('set', n), ('multiply', n) or ('divide', n). Each step is
+        applied to the abacus just before it is yielded as (rod_index, changes,
+        carry_info), with `changes` in the move_bead() format and carry_info set to
+        (next_rod, 'earth', 0, reason) when the step carries or borrows into the rod
+        on its left. The generator holds no per-step state, so it can be paused,
+        resumed or dropped at any point (the steps taken so far stay applied); run to
+        the end it leaves the same state as apply_move() plus its cascade, add(),
+        subtract(), set_value(), multiply() or divide().
+
+        Unknown operations and results that do not fit raise ValueError here, and
+        non-integer operands TypeError, before any step runs.
+        """
+        kind = operation[0]
+        if kind == 'move':
+            _, rod_index, bead_type, bead_index = operation
+            if not (0 <= rod_index < self.num_rods):
+                raise IndexError("Rod index out of bounds")
+            return self._iter_move_steps(rod_index, bead_type, bead_index) # Begins in apply_move()
+        if kind in ('add', 'subtract'):
+            n = operator.index(operation[1]) # Integers only, as for add()
+            sign = 1 if (kind == 'add') == (n >= 0) else -1
+            operand = _int_to_digits(abs(n))
+            for _ in self._iter_operand_digits(operand, sign):
+                pass # Dry run: raises if the result does not fit, without touching any rod
+            return self._iter_operation(self._iter_operand_steps(operand, sign))
+        if kind == 'set':
+            n = operator.index(operation[1])
+            if not (0 <= n < _pow10(self.num_rods)):
+                raise ValueError("Value does not fit on the abacus")
+            return self._iter_operation(self._iter_set_steps(_int_to_digits(n).rjust(self.num_rods, b'\0')))
+        if kind == 'multiply':
+            n = operator.index(operation[1])
+            self._check_result(self.get_value() * n)
+            return self._iter_operation(self._iter_multiply_steps(n))
+        if kind == 'divide':
+            n = operator.index(operation[1])
+            quotient, _ = self._divmod(n)
+            if quotient * _pow10(len(_int_to_digits(n))) >= _pow10(self.num_rods):
+                raise ValueError("Not enough rods to divide on the abacus; leave a free rod on the left")
+            return self._iter_operation(self._iter_divide_steps(n, quotient))
+        raise ValueError(f"Unknown operation {kind!r}")
+
+    def _iter_operation(self, steps):
+        self._begin_operation() # On the first step, so a generator never run records nothing
+        yield from steps
+
+    def _iter_move_steps(self, rod_index, bead_type, bead_index):
+        carry = False
+        while True:
+            changes, carry_info = self.apply_move(rod_index, bead_type, bead_index, carry)
+            yield rod_index, changes, carry_info
+            if carry_info is None or carry_info[0] < 0: # A carry off the leftmost rod is dropped
+                return
+            rod_index, bead_type, bead_index = carry_info[:3]
+            carry = True
+
+    def _iter_operand_digits(self, operand, sign, shift=0):
+        # Same right-to-left walk as _apply_operand(), one (rod_index, digit, carry) at a time.
+        # `shift` places the operand's units digit that many rods left of the units rod.
+        digits = self._digits
+        carry = 0
+        rod_index = self.num_rods - 1 - shift
+        operand_index = len(operand) - 1
+        while operand_index >= 0 or carry:
+            if rod_index < 0:
+                if carry < 0 or (carry == 0 and sign < 0):
+                    raise ValueError("Result would be negative")
+                raise ValueError("Result does not fit on the abacus")
+            delta = carry
+            if operand_index >= 0:
+                delta += sign * operand[operand_index]
+                operand_index -= 1
+            if delta:
+                carry, digit = divmod(digits[rod_index] + delta, 10)
+                yield rod_index, digit, carry
+            else:
+                carry = 0
+            rod_index -= 1
+
+    def _iter_operand_steps(self, operand, sign, shift=0):
+        digit_changes = _get_digit_changes()
+        for rod_index, digit, carry in self._iter_operand_digits(operand, sign, shift):
+            changes = list(digit_changes[self._state[rod_index]][digit])
+            self._set_rod_state(rod_index, _DIGIT_STATES[digit])
+            if carry:
+                carry_info = (rod_index - 1, 'earth', 0, 'rod_10_carry' if carry > 0 else 'rod_10_borrow')
+            else:
+                carry_info = None
+            if changes or carry_info:
+                yield rod_index, changes, carry_info
+
+    def _iter_digit_step(self, rod_index, digit):
+        # Sets one rod straight to the standard beads for `digit` (placing or clearing a figure)
+        changes = list(_get_digit_changes()[self._state[rod_index]][digit])
+        self._set_rod_state(rod_index, _DIGIT_STATES[digit])
+        if changes:
+            yield rod_index, changes, None
+
+    def _iter_multiply_steps(self, n):
+        # Suanpan multiplication from the head: each multiplicand figure is cleared and
+        # replaced by its partial products with every figure of the multiplier (one
+        # 9x9 table product at a time). Products only land on the figure's own rod and
+        # rods to its left, so the figures still to be multiplied are never disturbed.
+        multiplier = _int_to_digits(n)
+        for rod_index in range(self.num_rods):
+            figure = self._digits[rod_index]
+            if not figure:
+                continue
+            position = self.num_rods - 1 - rod_index
+            yield from self._iter_digit_step(rod_index, 0)
+            for offset, multiplier_figure in enumerate(reversed(multiplier)):
+                product = figure * multiplier_figure
+                if product:
+                    yield from self._iter_operand_steps(_int_to_digits(product), 1, position + offset)
+
+    def _iter_divide_steps(self, n, quotient):
+        # Suanpan long division: for each quotient figure from the head, subtract its
+        # products with the divisor's figures from the dividend, then place the figure
+        # len(divisor) rods to the left of where it belongs, on the rod the subtraction
+        # just freed. At the end the remainder is cleared and the quotient figures move
+        # right into place.
+        divisor = _int_to_digits(n)
+        shift = len(divisor)
+        quotient_digits = _int_to_digits(quotient)
+        for position in range(len(quotient_digits) - 1, -1, -1):
+            figure = quotient_digits[-1 - position]
+            if not figure:
+                continue
+            for offset, divisor_figure in enumerate(divisor):
+                product = figure * divisor_figure
+                if product:
+                    yield from self._iter_operand_steps(
+                        _int_to_digits(product), -1, position + len(divisor) - 1 - offset)
+            yield from self._iter_digit_step(self.num_rods - 1 - position - shift, figure)
+        units_rod = self.num_rods - 1
+        for rod_index in range(max(units_rod - shift + 1, 0), units_rod + 1): # Clear the remainder
+            if self._digits[rod_index]:
+                yield from self._iter_digit_step(rod_index, 0)
+        for position in range(len(quotient_digits)): # Lowest figure first, so targets are free
+            figure = quotient_digits[-1 - position]
+            if figure:
+                yield from self._iter_digit_step(units_rod - position - shift, 0)
+                yield from self._iter_digit_step(units_rod - position, figure)
+
+    def _iter_set_steps(self, target_digits):
+        digit_changes = _get_digit_changes()
+        for rod_index in range(self.num_rods - 1, -1, -1):
+            digit = target_digits[rod_index]
+            state = self._state[rod_index]
+            if state != _DIGIT_STATES[digit]:
+                changes = list(digit_changes[state][digit])
+                self._set_rod_state(rod_index, _DIGIT_STATES[digit])
+                yield rod_index, changes, None
+
+    def __str__(self):
+        lines = [f"Abacus with {self.num_rods} rods. Current value: {self.get_value_str()}"]
+        for i, rod in enumerate(self.rods):
+            lines.append(f"Rod {i}: Heaven: {rod['heaven_beads']}, Earth: {rod['earth_beads']}")
+        return "\n".join(lines) + "\n"
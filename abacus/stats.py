@@ -0,0 +1,121 @@
+"""Optional counters and timers for an Abacus and the widget showing it.
+
+Stats are off by default: Abacus.stats is None and every hot path only checks
+that. abacus.enable_stats() (or AbacusWidget.enable_stats()) attaches a Stats
+object, which the model, the animation scheduler and the widget update in place.
+snapshot() returns a StatsSnapshot, a frozen copy with derived rates that can be
+shown, compared or written out with dump_json() or dump_pstats(). The pstats
+file holds the counters as pseudo-functions, so pstats, snakeviz and similar
+tools can read it next to a real cProfile run.
+"""
+import json
+import marshal
+import time
+
+
+class Stats:
+    """Live counters, updated in place by the code being measured."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.move_bead_calls = {"heaven": 0, "earth": 0} # By clicked bead type
+        self.carries = 0 # Carry steps applied by apply_move()
+        self.cascades = 0 # Moves that carried at least once
+        self.max_cascade_depth = 0 # Most carry steps that followed a single move
+        self._cascade_depth = 0 # Carry steps since the last move that was not a carry
+        self.get_value_calls = 0
+        self.get_value_rebuilds = 0 # Calls that had to rebuild the int from the rod digits
+        self.paint_events = 0
+        self.paint_seconds = 0.0
+        self.max_paint_seconds = 0.0
+        self.max_pending = 0 # Deepest the animation queue got (operations not yet finished)
+
+    def record_move(self, carry):
+        if not carry:
+            self._cascade_depth = 0
+            return
+        self.carries += 1
+        self._cascade_depth += 1
+        if self._cascade_depth == 1:
+            self.cascades += 1
+        if self._cascade_depth > self.max_cascade_depth:
+            self.max_cascade_depth = self._cascade_depth
+
+    def record_paint(self, seconds):
+        self.paint_events += 1
+        self.paint_seconds += seconds
+        if seconds > self.max_paint_seconds:
+            self.max_paint_seconds = seconds
+
+    def record_pending(self, pending):
+        if pending > self.max_pending:
+            self.max_pending = pending
+
+    def snapshot(self):
+        return StatsSnapshot(self)
+
+
+class StatsSnapshot:
+    """Copy of a Stats object at one moment, with rates derived from it."""
+
+    def __init__(self, stats):
+        self.elapsed_seconds = time.perf_counter() - stats.started
+        self.move_bead_calls = dict(stats.move_bead_calls)
+        self.carries = stats.carries
+        self.cascades = stats.cascades
+        self.max_cascade_depth = stats.max_cascade_depth
+        self.mean_cascade_depth = stats.carries / stats.cascades if stats.cascades else 0.0
+        self.get_value_calls = stats.get_value_calls
+        self.get_value_rebuilds = stats.get_value_rebuilds
+        self.paint_events = stats.paint_events
+        self.paint_seconds = stats.paint_seconds
+        self.max_paint_seconds = stats.max_paint_seconds
+        self.mean_paint_seconds = stats.paint_seconds / stats.paint_events if stats.paint_events else 0.0
+        self.paints_per_second = stats.paint_events / self.elapsed_seconds if self.elapsed_seconds else 0.0
+        self.max_pending = stats.max_pending
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    def format(self):
+        """Multi-line text summary (used by the window's stats overlay)."""
+        return "\n".join([
+            f"move_bead   heaven {self.move_bead_calls['heaven']}  earth {self.move_bead_calls['earth']}",
+            f"carries     {self.carries} in {self.cascades} cascades"
+            f" (mean depth {self.mean_cascade_depth:.1f}, max {self.max_cascade_depth})",
+            f"get_value   {self.get_value_calls} calls, {self.get_value_rebuilds} rebuilds",
+            f"paint       {self.paint_events} ({self.paints_per_second:.1f}/s),"
+            f" mean {self.mean_paint_seconds * 1000:.2f} ms, max {self.max_paint_seconds * 1000:.2f} ms",
+            f"queue       max {self.max_pending} pending",
+        ])
+
+    def dump_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def dump_pstats(self, path):
+        """Writes the counters in the marshal format pstats.Stats(path) loads.
+
+        Each counter becomes a pseudo-function keyed ("abacus", 0, name) with its
+        call count; paint events also carry their total and inline time.
+        """
+        entries = {
+            f"move_bead[{bead_type}]": (calls, 0.0) for bead_type, calls in self.move_bead_calls.items()
+        }
+        entries["carry_step"] = (self.carries, 0.0)
+        entries["get_value"] = (self.get_value_calls, 0.0)
+        entries["get_value[rebuild]"] = (self.get_value_rebuilds, 0.0)
+        entries["paintEvent"] = (self.paint_events, self.paint_seconds)
+        profile = {
+            ("abacus", 0, name): (calls, calls, seconds, seconds, {})
+            for name, (calls, seconds) in entries.items()
+        }
+        with open(path, "wb") as f:
+            marshal.dump(profile, f)
+
+    def dump(self, path):
+        """dump_json() for a .json path, dump_pstats() otherwise."""
+        if path.endswith(".json"):
+            self.dump_json(path)
+        else:
+            self.dump_pstats(path)
@@ -0,0 +1,224 @@
+"""Packed binary files of abacus states, and a memory-mapped store over them.
+
+A state file starts with a 12-byte header (magic, version, rod count) followed
+by fixed-width states, each the packed state of every rod (one byte per rod,
+as in Abacus._state). State i starts at byte 12 + i * num_rods, so any state
+can be read without parsing the ones before it, and a batch of consecutive
+states is a plain (n, num_rods) uint8 array. A file cut short keeps its
+complete states.
+
+save() and load() handle a single abacus. StateWriter streams any number of
+abaci or AbacusBatch rows to one file, and StateStore mmaps a file and hands out
+Abacus instances or zero-copy AbacusBatch views of any range of states.
+
+    python -m abacus.store info states.abs
+    python -m abacus.store show states.abs [INDEX]
+"""
+import mmap
+import struct
+
+from abacus.batch import AbacusBatch, _numpy
+from abacus.model import Abacus, NUM_ROD_STATES
+
+MAGIC = b"ABST"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sH2xI") # magic, version, num_rods
+_VALID_STATES = bytes(range(NUM_ROD_STATES)) # Deleting these from a state leaves only invalid bytes
+
+DEFAULT_BUFFER_SIZE = 1 << 20 # Bytes collected before each write to the file
+
+_MMAP_ACCESS = {"r": mmap.ACCESS_READ, "r+": mmap.ACCESS_WRITE, "c": mmap.ACCESS_COPY}
+
+
+def _check_states(path, states):
+    if states.translate(None, _VALID_STATES):
+        raise ValueError(f"{path}: invalid rod state in abacus state file")
+
+
+def _read_header(path, header):
+    if len(header) < _HEADER.size:
+        raise ValueError(f"{path}: not an abacus state file")
+    magic, version, num_rods = _HEADER.unpack_from(header, 0)
+    if magic != MAGIC or num_rods < 1:
+        raise ValueError(f"{path}: not an abacus state file")
+    if version != VERSION:
+        raise ValueError(f"{path}: unsupported abacus state file version {version}")
+    return num_rods
+
+
+def save(abacus, path):
+    """Writes one abacus to a new state file."""
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, abacus.num_rods))
+        f.write(abacus._state)
+
+
+def load(path, index=0):
+    """Returns a new Abacus holding state `index` of a state file (the first by default).
+
+    Reads only the header and that one state; use StateStore to read many.
+    """
+    if index < 0:
+        raise IndexError("State index out of range")
+    with open(path, "rb") as f:
+        num_rods = _read_header(path, f.read(_HEADER.size))
+        f.seek(_HEADER.size + index * num_rods)
+        states = f.read(num_rods)
+    if len(states) < num_rods:
+        raise IndexError("State index out of range")
+    _check_states(path, states)
+    abacus = Abacus(num_rods)
+    abacus._load_states(states)
+    return abacus
+
+
+class StateWriter:
+    """Writes any number of abacus states with the same rod count to a new state file.
+
+    States are packed into an in-memory buffer and written `buffer_size` bytes
+    at a time; close() (or leaving a `with` block) flushes the rest.
+    """
+
+    def __init__(self, path, num_rods, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.path = path
+        self.num_rods = num_rods
+        self.buffer_size = buffer_size
+        self.states_written = 0
+        self._buffer = bytearray(_HEADER.pack(MAGIC, VERSION, num_rods))
+        self._file = open(path, "wb")
+
+    def append(self, abacus):
+        if abacus.num_rods != self.num_rods:
+            raise ValueError("All abaci in a state file must have the same number of rods")
+        self._buffer += abacus._state
+        self.states_written += 1
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def append_batch(self, batch):
+        """Appends every row of an AbacusBatch, written straight from its array."""
+        if batch.num_rods != self.num_rods:
+            raise ValueError("All abaci in a state file must have the same number of rods")
+        self.flush()
+        self._file.write(memoryview(batch.states.reshape(-1))) # reshape copies only if not contiguous
+        self.states_written += len(batch)
+
+    def flush(self):
+        self._file.write(self._buffer)
+        self._buffer.clear()
+        self._file.flush()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def save_many(abaci, path):
+    """Writes an iterable of abaci (all with the same rod count) or an AbacusBatch to a new state file."""
+    if hasattr(abaci, "states"):
+        with StateWriter(path, abaci.num_rods) as writer:
+            writer.append_batch(abaci)
+        return
+    abaci = iter(abaci)
+    first = next(abaci, None)
+    if first is None:
+        raise ValueError("save_many() needs at least one abacus to know the rod count")
+    with StateWriter(path, first.num_rods) as writer:
+        writer.append(first)
+        for abacus in abaci:
+            writer.append(abacus)
+
+
+class StateStore:
+    """Memory-mapped view of a state file: random access to states and zero-copy batches.
+
+    `mode` follows numpy.memmap: "r" is read-only, "r+" writes batch changes
+    through to the file, and "c" allows changes in memory only.
+    """
+
+    def __init__(self, path, mode="r"):
+        if mode not in _MMAP_ACCESS:
+            raise ValueError("mode must be 'r', 'r+' or 'c'")
+        self.path = path
+        self.mode = mode
+        with open(path, "r+b" if mode == "r+" else "rb") as f:
+            # Checked before mapping: mmap refuses empty files with its own error
+            self.num_rods = _read_header(path, f.read(_HEADER.size))
+            self._map = mmap.mmap(f.fileno(), 0, access=_MMAP_ACCESS[mode])
+        # Complete states present (a writer that was cut short may leave a partial tail)
+        self.num_states = (len(self._map) - _HEADER.size) // self.num_rods
+
+    def __len__(self):
+        return self.num_states
+
+    def close(self):
+        try:
+            self._map.close()
+        except BufferError:
+            pass # Batch views still use the mapping; it is released with the last of them
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def states_at(self, index):
+        """Packed rod states of one saved abacus, as bytes."""
+        if not 0 <= index < self.num_states:
+            raise IndexError("State index out of range")
+        offset = _HEADER.size + index * self.num_rods
+        return self._map[offset:offset + self.num_rods]
+
+    def get(self, index):
+        """Returns a new Abacus holding a copy of state `index`."""
+        states = self.states_at(index)
+        _check_states(self.path, states)
+        abacus = Abacus(self.num_rods)
+        abacus._load_states(states)
+        return abacus
+
+    def batch(self, start=0, stop=None):
+        """Returns an AbacusBatch whose states array is a view of states [start, stop) in the file.
+
+        Nothing is copied or parsed, so opening a range of millions of states is
+        immediate. Rod states are not validated here, unlike get().
+        """
+        np = _numpy()
+        stop = self.num_states if stop is None else min(stop, self.num_states)
+        if not 0 <= start <= stop:
+            raise IndexError("State range out of range")
+        states = np.frombuffer(self._map, dtype=np.uint8, count=(stop - start) * self.num_rods,
+                               offset=_HEADER.size + start * self.num_rods)
+        return AbacusBatch.from_states(states.reshape(stop - start, self.num_rods))
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m abacus.store", description="Inspect an abacus state file")
+    parser.add_argument("command", choices=("info", "show"))
+    parser.add_argument("path")
+    parser.add_argument("index", type=int, nargs="?", default=0, help="state to show (default 0)")
+    args = parser.parse_args(argv)
+
+    with StateStore(args.path) as store:
+        if args.command == "info":
+            print(f"rods: {store.num_rods}")
+            print(f"states: {store.num_states}")
+            return 0
+        print(store.get(args.index).get_value_str())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1 @@
+"""Benchmark suite for the abacus model and widget: python -m benchmarks --help"""
@@ -0,0 +1,52 @@
+"""Times AbacusBatch bulk additions against a loop over Abacus instances.
+
+Run from the repository root: python benchmarks/bench_batch.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from abacus import Abacus, AbacusBatch
+
+N_ABACI = 10_000
+NUM_RODS = 13
+ROUNDS = 20
+
+
+def main():
+    rng = random.Random(1234)
+    # Keep totals below 10**13 so no row overflows during the run
+    rounds = [[rng.randrange(10 ** 10) for _ in range(N_ABACI)] for _ in range(ROUNDS)]
+
+    abaci = [Abacus(NUM_RODS) for _ in range(N_ABACI)]
+    start = time.perf_counter()
+    for operands in rounds:
+        for abacus, operand in zip(abaci, operands):
+            abacus.add(operand, record_changes=False)
+    loop_seconds = time.perf_counter() - start
+
+    batch = AbacusBatch(N_ABACI, NUM_RODS)
+    start = time.perf_counter()
+    for operands in rounds:
+        batch.add(np.array(operands, dtype=np.int64))
+    batch_seconds = time.perf_counter() - start
+
+    if [abacus.get_value() for abacus in abaci] != batch.get_values().tolist():
+        raise SystemExit("AbacusBatch results differ from Abacus")
+    if any(bytes(abacus._state) != batch.states[row].tobytes() for row, abacus in enumerate(abaci)):
+        raise SystemExit("AbacusBatch bead states differ from Abacus")
+
+    additions = N_ABACI * ROUNDS
+    print(f"{additions:,} additions on {N_ABACI:,} abaci x {NUM_RODS} rods")
+    print(f"Abacus loop:  {loop_seconds:8.3f} s  {additions / loop_seconds:>12,.0f} adds/s")
+    print(f"AbacusBatch:  {batch_seconds:8.3f} s  {additions / batch_seconds:>12,.0f} adds/s")
+    print(f"Speedup:      {loop_seconds / batch_seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
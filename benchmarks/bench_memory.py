@@ -0,0 +1,39 @@
+"""Compares rod storage memory: the old list-of-dicts layout against the packed byte buffer.
+
+Run from the repository root: python benchmarks/bench_memory.py
+"""
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from abacus import Abacus
+
+ROD_COUNTS = (1_000, 100_000, 1_000_000)
+
+
+def _dict_of_lists_rods(num_rods):
+    # The pre-packing layout: one dict holding two lists per rod
+    return [{'heaven_beads': [0, 0], 'earth_beads': [0, 0, 0, 0, 0]} for _ in range(num_rods)]
+
+
+def _measure(factory, num_rods):
+    tracemalloc.start()
+    obj = factory(num_rods)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return size
+
+
+def main():
+    print(f"{'rods':>10} {'dict-of-lists':>16} {'packed':>12} {'ratio':>8}")
+    for num_rods in ROD_COUNTS:
+        old = _measure(_dict_of_lists_rods, num_rods)
+        new = _measure(Abacus, num_rods)
+        print(f"{num_rods:>10} {old:>14,} B {new:>10,} B {old / new:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
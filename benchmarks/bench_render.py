@@ -0,0 +1,50 @@
+"""Times AbacusWidget repaints under the offscreen Qt platform.
+
+For each rod count it measures a full-widget repaint and a single-rod repaint
+(what a bead click triggers). Rod counts that do not fit the width switch the
+widget to viewport mode, so their cost should track the visible rods only. Run from the repository root:
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_render.py
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QRect
+from PyQt6.QtWidgets import QApplication
+
+ROD_COUNTS = (13, 100, 500, 2000, 100_000)
+WIDGET_SIZE = (1600, 600)
+REPEATS = 50
+
+
+def _time_repaints(widget, rect, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        widget.repaint(rect)
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+    from ui.abacus_widget import AbacusWidget
+
+    print(f"{'rods':>6} {'full repaint':>14} {'one rod':>10}")
+    for num_rods in ROD_COUNTS:
+        widget = AbacusWidget(num_rods=num_rods)
+        widget.resize(*WIDGET_SIZE)
+        widget.show()
+        app.processEvents()
+        widget.abacus.set_value(10 ** num_rods // 7) # Mix of bead positions on every rod
+        widget.ensure_rod_visible(num_rods // 2)
+        full = _time_repaints(widget, widget.rect(), REPEATS)
+        one_rod = _time_repaints(widget, QRect(*widget._get_layout().rod_rect(num_rods // 2)), REPEATS)
+        print(f"{num_rods:>6} {full * 1000:>11.3f} ms {one_rod * 1000:>7.3f} ms")
+        widget.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Startup benchmark for the headless and GUI launch paths, with regression thresholds.
+
+Each path is launched as a fresh interpreter several times and the median wall
+time is compared against a threshold. One extra run per path uses
+`python -X importtime` to list the slowest imports and to check that the
+headless path never loads PyQt6. Exits with status 1 on a regression.
+
+    python benchmarks/bench_startup.py [--runs N] [--max-headless-ms MS] [--max-gui-ms MS]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LAUNCH_PATHS = {
+    # Full headless launch on empty input: interpreter, main.py and the abacus core
+    "headless": [sys.executable, "main.py", "--headless", "-"],
+    # GUI launch until the window has been shown and the event loop has started
+    "gui": [sys.executable, "main.py", "--exit-after-startup"],
+}
+
+
+def _environment():
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    return env
+
+
+def time_launch(command, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=REPO_ROOT, env=_environment(), stdin=subprocess.DEVNULL,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def import_times(command):
+    """Returns {module: cumulative microseconds} from a `python -X importtime` run."""
+    result = subprocess.run([command[0], "-X", "importtime", *command[1:]], cwd=REPO_ROOT,
+                            env=_environment(), stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-headless-ms", type=float, default=120.0)
+    parser.add_argument("--max-gui-ms", type=float, default=500.0)
+    parser.add_argument("--top", type=int, default=5, help="slowest imports to list per path")
+    args = parser.parse_args()
+    thresholds = {"headless": args.max_headless_ms, "gui": args.max_gui_ms}
+
+    failed = False
+    for name, command in LAUNCH_PATHS.items():
+        median_ms = time_launch(command, args.runs)
+        modules = import_times(command)
+        within = median_ms <= thresholds[name]
+        print(f"{name}: median {median_ms:.1f} ms over {args.runs} runs "
+              f"(threshold {thresholds[name]:.0f} ms) {'ok' if within else 'REGRESSION'}")
+        for module, cumulative in sorted(modules.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"    {cumulative / 1000:8.1f} ms  {module}")
+        failed |= not within
+        if name == "headless" and any(module.split(".")[0] == "PyQt6" for module in modules):
+            print("headless: PyQt6 was imported on the headless path REGRESSION")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,408 @@
+"""Benchmark suite: model moves, carry cascades, multiply/divide, event logs, state files, value reads and widgets.
+
+    python -m benchmarks run [-o results.json] [-k substring]
+    python -m benchmarks compare baseline.json results.json [--threshold 0.15]
+
+`run` times every case and writes machine-readable JSON (seconds per operation,
+median and best of several repeats). `compare` reports the change per case and
+exits with status 1 when any case is slower than the baseline by more than the
+threshold. Widget cases run under the offscreen Qt platform and are skipped when
+PyQt6 is not installed; the state store cases over many states need NumPy and
+are skipped without it.
+"""
+import argparse
+import atexit
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from abacus import Abacus, NUM_ROD_STATES
+
+CASES = {} # name -> setup function returning (callable, operations per call)
+
+MIN_REPEAT_SECONDS = 0.05
+REPEATS = 5
+
+
+def case(name):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+_ALL_BEADS = [("heaven", i) for i in range(2)] + [("earth", i) for i in range(5)]
+
+_open_logs = [] # (log, path) pairs of eventlog and store cases; log (a writer, reader or None) is closed and path removed when the run ends
+
+
+def _log_path(name, extension="abl"):
+    return os.path.join(tempfile.gettempdir(), f"abacus-bench-{os.getpid()}-{name}.{extension}")
+
+
+@atexit.register
+def _remove_logs():
+    for log, path in _open_logs:
+        if log is not None:
+            log.close()
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _move_every_bead(use_transition_table):
+    abacus = Abacus(1, use_transition_table=use_transition_table)
+
+    def run():
+        for state in range(NUM_ROD_STATES):
+            abacus._set_rod_state(0, state)
+            for bead_type, bead_index in _ALL_BEADS:
+                abacus.move_bead(0, bead_type, bead_index)
+    return run, NUM_ROD_STATES * len(_ALL_BEADS)
+
+
+@case("move_bead/all_states/table")
+def _():
+    return _move_every_bead(True)
+
+
+@case("move_bead/all_states/branching")
+def _():
+    return _move_every_bead(False)
+
+
+def _add_cascade(num_rods):
+    # 0999...9 + 1: the carry runs through every rod but the top one
+    abacus = Abacus(num_rods)
+    start_value = 10 ** (num_rods - 1) - 1
+
+    def run():
+        abacus.set_value(start_value, record_changes=False)
+        abacus.add(1)
+    return run, 1
+
+
+def _borrow_cascade(num_rods):
+    # 1000...0 - 1: the borrow runs through every rod
+    abacus = Abacus(num_rods)
+    start_value = 10 ** (num_rods - 1)
+
+    def run():
+        abacus.set_value(start_value, record_changes=False)
+        abacus.subtract(1)
+    return run, 1
+
+
+def _units_rollover(num_rods, recorded=False):
+    # A click that rolls the units rod of an all-nines abacus over: one carry into the
+    # tens rod, which absorbs it, so two apply_move() steps whatever the rod count
+    abacus = Abacus(num_rods)
+    start_value = 10 ** num_rods - 1
+    if recorded:
+        from abacus.eventlog import EventLogWriter
+        path = _log_path("record")
+        _open_logs.append((EventLogWriter(path, abacus), path)) # Logs every move and set_value
+
+    def run():
+        abacus.set_value(start_value, record_changes=False)
+        move = (num_rods - 1, "earth", 4)
+        while move is not None and move[0] >= 0:
+            _, carry_info = abacus.apply_move(*move)
+            move = carry_info[:3] if carry_info else None
+    return run, 1
+
+
+for _num_rods in (13, 10_000):
+    case(f"cascade/add_carry/{_num_rods}_rods")(lambda n=_num_rods: _add_cascade(n))
+    case(f"cascade/subtract_borrow/{_num_rods}_rods")(lambda n=_num_rods: _borrow_cascade(n))
+
+
+def _multiply_divide(num_rods, operation, traced):
+    # The multiplicand leaves room for the 9-figure operand's product; the dividend
+    # fills every rod but the free one division needs on the left
+    abacus = Abacus(num_rods)
+    start_value = 10 ** (num_rods - (10 if operation == "multiply" else 1)) // 7
+    operand = 123_456_789
+    if traced:
+        def run():
+            abacus.set_value(start_value, record_changes=False)
+            for _ in abacus.iter_steps((operation, operand)):
+                pass
+    else:
+        method = getattr(abacus, operation)
+
+        def run():
+            abacus.set_value(start_value, record_changes=False)
+            method(operand, record_changes=False)
+    return run, 1
+
+
+for _num_rods in (13, 1_000):
+    for _operation in ("multiply", "divide"):
+        case(f"{_operation}/fast/{_num_rods}_rods")(
+            lambda n=_num_rods, o=_operation: _multiply_divide(n, o, False))
+        case(f"{_operation}/trace/{_num_rods}_rods")(
+            lambda n=_num_rods, o=_operation: _multiply_divide(n, o, True))
+
+
+@case("click/units_rollover/13_rods")
+def _():
+    return _units_rollover(13)
+
+
+@case("eventlog/record_units_rollover/13_rods")
+def _():
+    return _units_rollover(13, recorded=True)
+
+
+@case("eventlog/replay/100k_records")
+def _():
+    from abacus.eventlog import EventLogReader, EventLogWriter
+
+    abacus = Abacus(13)
+    moves = [(rod, bead_type, bead_index) for rod in range(13) for bead_type, bead_index in _ALL_BEADS]
+    path = _log_path("replay")
+    with EventLogWriter(path, abacus, checkpoint_interval=1 << 20) as recorder:
+        while recorder.records_written < 100_000:
+            for move in moves:
+                abacus.apply_move(*move)
+    log = EventLogReader(path)
+    _open_logs.append((log, path))
+
+    def run():
+        log.states_at(log.num_records, use_checkpoints=False)
+    return run, log.num_records
+
+
+@case("store/save_load/13_rods")
+def _():
+    from abacus import store
+
+    abacus = Abacus(13)
+    abacus.set_value(10 ** 13 // 7, record_changes=False)
+    path = _log_path("save_load", "abs")
+    _open_logs.append((None, path))
+
+    def run():
+        store.save(abacus, path)
+        store.load(path)
+    return run, 1
+
+
+def _state_store(name):
+    # One million 13-rod states, written from a batch
+    from abacus import AbacusBatch, store
+    import numpy as np
+
+    batch = AbacusBatch(1_000_000, 13)
+    batch.set_values(np.arange(len(batch), dtype=np.int64) * 9_999_991)
+    path = _log_path(name, "abs")
+    store.save_many(batch, path)
+    return store, path
+
+
+@case("store/get/1m_states")
+def _():
+    store, path = _state_store("get")
+    states = store.StateStore(path)
+    _open_logs.append((states, path))
+    indices = range(0, len(states), len(states) // 1000)
+
+    def run():
+        for index in indices:
+            states.get(index)
+    return run, len(indices)
+
+
+@case("store/open_batch/1m_states")
+def _():
+    store, path = _state_store("open_batch")
+    _open_logs.append((None, path))
+
+    def run():
+        with store.StateStore(path) as states:
+            states.batch()
+    return run, 1
+
+
+def _get_value(num_rods, cached):
+    abacus = Abacus(num_rods)
+    abacus.set_value(10 ** num_rods // 7, record_changes=False)
+
+    def run():
+        if not cached:
+            abacus._value = None # Force the rebuild from the digit cache
+        abacus.get_value()
+    return run, 1
+
+
+for _num_rods in (13, 1_000, 10_000, 100_000):
+    case(f"get_value/cold/{_num_rods}_rods")(lambda n=_num_rods: _get_value(n, False))
+    case(f"get_value/cached/{_num_rods}_rods")(lambda n=_num_rods: _get_value(n, True))
+
+
+_qt_app = None # Kept alive for the whole run; widgets die with their QApplication
+
+
+def _widget(num_rods, size=(800, 400)):
+    global _qt_app
+    from PyQt6.QtWidgets import QApplication
+    _qt_app = QApplication.instance() or QApplication([sys.argv[0]])
+    from ui.abacus_widget import AbacusWidget
+
+    widget = AbacusWidget(num_rods=num_rods)
+    widget.resize(*size)
+    widget.animation.instant = True # Clicks must not leave queued cascades behind
+    widget.show()
+    _qt_app.processEvents()
+    widget.abacus.set_value(10 ** num_rods // 7, record_changes=False)
+    return widget
+
+
+def _paint(num_rods):
+    widget = _widget(num_rods)
+
+    def run():
+        widget.repaint()
+    return run, 1
+
+
+def _mouse_press(num_rods):
+    from PyQt6.QtCore import QEvent, QPointF, Qt
+    from PyQt6.QtGui import QMouseEvent
+
+    widget = _widget(num_rods)
+    widget.ensure_rod_visible(num_rods // 2) # Large abaci scroll; click a rod on screen
+    x, y, width, height = widget._get_layout().bead_rect(num_rods // 2, "earth", 2, 0)
+    position = QPointF(x + width / 2, y + height / 2)
+    event = QMouseEvent(QEvent.Type.MouseButtonPress, position, position, Qt.MouseButton.LeftButton,
+                        Qt.MouseButton.LeftButton, Qt.KeyboardModifier.NoModifier)
+
+    def run():
+        widget.mousePressEvent(event)
+    return run, 1
+
+
+for _num_rods in (13, 200, 100_000):
+    case(f"widget/paintEvent/{_num_rods}_rods")(lambda n=_num_rods: _paint(n))
+    case(f"widget/mousePressEvent/{_num_rods}_rods")(lambda n=_num_rods: _mouse_press(n))
+
+
+def _module_available(name):
+    try:
+        __import__(name)
+    except ImportError:
+        return False
+    return True
+
+
+def time_case(setup):
+    """Returns per-operation timings for one case, calibrating the loop count first."""
+    run, operations = setup()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_REPEAT_SECONDS or number >= 1 << 20:
+            break
+        number *= 2
+    samples = [elapsed]
+    for _ in range(REPEATS - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        samples.append(time.perf_counter() - start)
+    per_op = [sample / (number * operations) for sample in samples]
+    return {
+        "seconds_per_op": statistics.median(per_op),
+        "best_seconds_per_op": min(per_op),
+        "operations": number * operations,
+        "repeats": REPEATS,
+    }
+
+
+def run_suite(args):
+    qt_available = _module_available("PyQt6.QtWidgets")
+    numpy_available = _module_available("numpy")
+    results = {}
+    for name, setup in CASES.items():
+        if args.filter and args.filter not in name:
+            continue
+        if name.startswith("widget/") and not qt_available:
+            print(f"{name:<44} skipped (PyQt6 not installed)")
+            continue
+        if name.startswith("store/") and name.endswith("_states") and not numpy_available:
+            print(f"{name:<44} skipped (NumPy not installed)")
+            continue
+        results[name] = time_case(setup)
+        print(f"{name:<44} {results[name]['seconds_per_op'] * 1e6:>12.3f} us/op")
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"wrote {args.output}")
+    return 0
+
+
+def compare(args):
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)["results"]
+
+    regressions = 0
+    for name in sorted(set(baseline) | set(current)):
+        if name not in current or name not in baseline:
+            print(f"{name:<44} {'only in ' + ('baseline' if name in baseline else 'current'):>30}")
+            continue
+        before = baseline[name]["seconds_per_op"]
+        after = current[name]["seconds_per_op"]
+        change = after / before - 1
+        status = ""
+        if change > args.threshold:
+            status = "REGRESSION"
+            regressions += 1
+        elif change < -args.threshold:
+            status = "faster"
+        print(f"{name:<44} {before * 1e6:>11.3f} -> {after * 1e6:>11.3f} us/op {change:>+8.1%} {status}")
+    print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Abacus benchmark suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="time every case and optionally write JSON")
+    run_parser.add_argument("-o", "--output", help="JSON file to write the results to")
+    run_parser.add_argument("-k", "--filter", help="only run cases whose name contains this text")
+    run_parser.set_defaults(handler=run_suite)
+
+    compare_parser = commands.add_parser("compare", help="compare a results file against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.15,
+                                help="allowed slowdown before a case counts as a regression (default 0.15)")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
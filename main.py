@@ -1,41 +1,106 @@
 import sys
-import sys
-from PyQt6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QWidget, QLineEdit
-from PyQt6.QtCore import Qt
-from ui.abacus_widget import AbacusWidget
+import time
+
+# Qt is imported only on the GUI path, so --headless runs on machines without PyQt6 or a display.
+
+_MAIN_START = time.perf_counter() # Startup phases are reported relative to this
+
+
+def parse_headless_args(argv):
+    import argparse # Only the headless path parses its own options
+
+    parser = argparse.ArgumentParser(description="Abacus calculator (headless mode)")
+    parser.add_argument("--headless", action="store_true", required=True,
+                        help="evaluate operations from a file or stdin without opening a window")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="headless input file, one computation per line ('-' for stdin)")
+    parser.add_argument("--rods", type=int, default=13, help="rods per abacus in headless mode")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="headless worker processes (default: CPU count, 1 disables the pool)")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="input lines sent to a worker process at a time")
+    parser.add_argument("--trace", action="store_true",
+                        help="print every bead step before each result (runs in a single process)")
+    return parser.parse_args(argv)
+
+
+def parse_gui_args(argv):
+    """Returns the window's options and the arguments left for QApplication (e.g. -platform)."""
+    import argparse
+
+    # allow_abbrev=False keeps Qt's single-dash options from being read as abbreviations of ours
+    parser = argparse.ArgumentParser(description="Abacus calculator", allow_abbrev=False)
+    parser.add_argument("--rods", type=int, default=13, help="number of rods")
+    parser.add_argument("--record", metavar="PATH", help="log the session's bead moves (see abacus.eventlog)")
+    parser.add_argument("--stats", action="store_true", help="show the stats overlay (also toggled with F3)")
+    parser.add_argument("--stats-out", metavar="PATH",
+                        help="write the counters on exit: JSON for a .json path, pstats format otherwise")
+    parser.add_argument("--startup-timing", action="store_true", help="print per-phase startup times to stderr")
+    parser.add_argument("--exit-after-startup", action="store_true",
+                        help="quit once the window is up (for startup benchmarks)")
+    return parser.parse_known_args(argv)
+
+
+def _report_startup(phases):
+    previous = _MAIN_START
+    for name, timestamp in phases:
+        print(f"startup: {name:<24} {(timestamp - previous) * 1000:8.1f} ms"
+              f" (total {(timestamp - _MAIN_START) * 1000:8.1f} ms)", file=sys.stderr)
+        previous = timestamp
+
+
+def run_gui(qt_argv, startup_timing=False, exit_after_startup=False, num_rods=13, record_path=None,
+            show_stats=False, stats_path=None):
+    phases = []
+
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import QTimer
+    phases.append(("import Qt", time.perf_counter()))
+
+    app = QApplication(qt_argv)
+    phases.append(("create QApplication", time.perf_counter()))
+
+    from ui.main_window import AbacusWindow
+    phases.append(("import UI modules", time.perf_counter()))
 
-class AbacusWindow(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("Abacus Calculator")
-        self.setGeometry(100, 100, 800, 600) # Adjust size as needed
+    window = AbacusWindow(num_rods=num_rods)
+    phases.append(("create window", time.perf_counter()))
 
-        central_widget = QWidget()
-        self.setCentralWidget(central_widget)
-        layout = QVBoxLayout(central_widget)
+    if record_path is not None:
+        from abacus.eventlog import EventLogWriter
+        recorder = EventLogWriter(record_path, window.abacus_widget.abacus)
+        app.aboutToQuit.connect(window.abacus_widget.animation.flush) # Log queued cascade steps too
+        app.aboutToQuit.connect(recorder.close)
 
-        # Value display at the top
-        self.value_display = QLineEdit()
-        self.value_display.setReadOnly(True) # Make it read-only
-        self.value_display.setAlignment(Qt.AlignmentFlag.AlignRight) # Align text to the right
-        self.value_display.setStyleSheet("font-size: 30px; padding: 5px;") # Style it
-        layout.addWidget(self.value_display)
+    if show_stats:
+        window.show_stats_overlay()
+    if stats_path is not None:
+        stats = window.abacus_widget.enable_stats()
+        app.aboutToQuit.connect(lambda: stats.snapshot().dump(stats_path))
 
-        self.abacus_widget = AbacusWidget()
-        layout.addWidget(self.abacus_widget)
+    def on_event_loop_started():
+        # Runs after the window's first show/paint events have been processed
+        phases.append(("first event loop pass", time.perf_counter()))
+        if startup_timing:
+            _report_startup(phases)
+        if exit_after_startup:
+            app.quit()
 
-        # Connect the abacus widget's valueChanged signal to update the display
-        self.abacus_widget.valueChanged.connect(self.update_value_display)
+    QTimer.singleShot(0, on_event_loop_started)
+    return app.exec()
 
-        # Initialize display with current abacus value
-        self.update_value_display(self.abacus_widget.abacus.get_value())
 
-        self.show()
+def main(argv=None):
+    argv = list(sys.argv if argv is None else argv)
+    if "--headless" in argv[1:]:
+        args = parse_headless_args(argv[1:])
+        from abacus.headless import run_headless
+        return run_headless(args.input, num_rods=args.rods, workers=args.workers, chunk_size=args.chunk_size,
+                            trace=args.trace)
 
-    def update_value_display(self, value):
-        self.value_display.setText(str(value))
+    args, qt_args = parse_gui_args(argv[1:])
+    return run_gui(argv[:1] + qt_args, args.startup_timing, args.exit_after_startup, args.rods, args.record,
+                   args.stats, args.stats_out)
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = AbacusWindow()
-    sys.exit(app.exec())
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""AnimationScheduler driven by a fake clock and fake timer hooks; no display needed."""
+import pytest
+
+from abacus import Abacus
+from ui.animation import AnimationScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Harness:
+    """A scheduler over a fresh abacus, recording every callback and timer call."""
+
+    def __init__(self, num_rods=6, value=0, step_interval=0.5):
+        self.abacus = Abacus(num_rods)
+        self.abacus.set_value(value)
+        self.clock = FakeClock()
+        self.rod_updates = []
+        self.value_updates = []
+        self.timer_running = False
+        self.timer_starts = 0
+        self.scheduler = AnimationScheduler(
+            self.abacus, self.rod_updates.append, self.value_updates.append, step_interval=step_interval,
+            clock=self.clock, start_timer=self._start_timer, stop_timer=self._stop_timer)
+
+    def _start_timer(self):
+        self.timer_running = True
+        self.timer_starts += 1
+
+    def _stop_timer(self):
+        self.timer_running = False
+
+    def tick_at(self, now):
+        self.clock.now = now
+        self.rod_updates.clear()
+        self.value_updates.clear()
+        self.scheduler.tick()
+
+
+def _final_value(num_rods, value, operations):
+    # The same operations run to completion one after another, without a scheduler
+    abacus = Abacus(num_rods)
+    abacus.set_value(value)
+    for operation in operations:
+        for _ in abacus.iter_steps(operation):
+            pass
+    return abacus.get_value()
+
+
+@pytest.mark.parametrize("speed", [1.0, 2.0, 4.0])
+def test_steps_are_paced_at_step_interval_over_speed(speed):
+    harness = Harness(num_rods=6)
+    harness.scheduler.speed = speed
+    interval = 0.5 / speed
+    harness.scheduler.submit(("add", 11111)) # One step per rod, units rod first
+    assert harness.abacus.get_value() == 1 # The first step runs at once
+    steps_done = 1
+    for step in range(1, 5):
+        harness.tick_at(step * interval - 1e-6)
+        assert harness.rod_updates == [] and harness.value_updates == []
+        harness.tick_at(step * interval)
+        steps_done += 1
+        assert harness.rod_updates == [[6 - steps_done]]
+        assert harness.abacus.get_value() == int("1" * steps_done)
+    assert harness.abacus.get_value() == 11111
+
+
+def test_click_during_a_cascade_runs_after_it():
+    harness = Harness(num_rods=5, value=9999)
+    harness.scheduler.submit_move(4, "earth", 4) # Units rod rolls over and carries
+    assert harness.scheduler.pending == 1 and harness.abacus.get_value() == 9990
+    harness.scheduler.submit_move(3, "earth", 1) # Clicked while the carry is still pending
+    assert harness.scheduler.pending == 2
+    assert harness.abacus.rods[3]["earth_beads"] == [1, 1, 1, 1, 0] # Not touched yet
+
+    harness.tick_at(0.5) # The carry step
+    assert harness.scheduler.pending == 1 and harness.abacus.get_value() == 9950
+    harness.tick_at(1.0) # Then the queued click, on the rod the carry changed
+    assert harness.scheduler.is_idle()
+    assert harness.abacus.get_value() == _final_value(
+        5, 9999, [("move", 4, "earth", 4), ("move", 3, "earth", 1)])
+
+
+def test_instant_mode_collapses_the_queue_into_one_publish():
+    harness = Harness(num_rods=6, value=99999)
+    harness.scheduler.instant = True
+    harness.scheduler.submit(("add", 1)) # Carry through five rods
+    assert harness.scheduler.is_idle()
+    assert harness.rod_updates == [[0, 1, 2, 3, 4, 5]]
+    assert harness.value_updates == [None]
+    assert harness.abacus.get_value() == 100000
+    assert not harness.timer_running
+
+
+def test_flush_applies_every_queued_operation_at_once():
+    harness = Harness(num_rods=6, value=99999)
+    operations = [("add", 1), ("move", 5, "earth", 0), ("subtract", 20)]
+    for operation in operations:
+        harness.scheduler.submit(operation)
+    harness.rod_updates.clear()
+    harness.value_updates.clear()
+    harness.scheduler.flush()
+    assert harness.scheduler.is_idle() and not harness.timer_running
+    assert len(harness.rod_updates) == 1 and len(harness.value_updates) == 1
+    assert harness.abacus.get_value() == _final_value(6, 99999, operations)
+
+
+def test_at_most_one_update_per_tick():
+    harness = Harness(num_rods=8, value=9999999)
+    harness.scheduler.submit(("add", 1))
+    harness.scheduler.submit(("add", 1234))
+    harness.tick_at(100.0) # Every remaining step is overdue
+    assert harness.scheduler.is_idle()
+    assert len(harness.rod_updates) == 1 and len(harness.value_updates) == 1
+    assert harness.rod_updates[0] == sorted(set(harness.rod_updates[0]))
+    assert harness.abacus.get_value() == _final_value(8, 9999999, [("add", 1), ("add", 1234)])
+
+
+def test_tick_without_changes_publishes_nothing():
+    harness = Harness(num_rods=5, value=9999)
+    harness.scheduler.submit_move(4, "earth", 4)
+    harness.tick_at(0.25) # Nothing due yet
+    assert harness.rod_updates == [] and harness.value_updates == []
+
+
+def test_publishing_never_builds_the_value():
+    harness = Harness(num_rods=40, value=10 ** 39 - 1)
+    stats = harness.abacus.enable_stats()
+    harness.scheduler.submit(("add", 1)) # One step per rod; the first runs at once
+    for step in range(1, 40):
+        harness.tick_at(step * 0.5)
+        assert harness.value_updates == [None]
+    harness.scheduler.publish_changes([0])
+    assert stats.get_value_calls == 0
+    assert harness.abacus.get_value_str() == "1" + "0" * 39
+
+
+def test_timer_runs_only_while_steps_are_pending():
+    harness = Harness(num_rods=5, value=9999)
+    harness.scheduler.submit_move(4, "earth", 0) # Lowers the raised earth beads: 9 -> 5
+    assert harness.timer_starts == 0 and not harness.timer_running
+    harness.scheduler.submit_move(4, "earth", 0) # 5 -> 6
+    assert harness.abacus.get_value() == 9996 and harness.timer_starts == 0
+
+    harness.abacus.set_value(9999)
+    harness.scheduler.submit_move(4, "earth", 4) # Carries
+    assert harness.timer_running and harness.timer_starts == 1
+    harness.tick_at(0.4)
+    assert harness.timer_running
+    harness.tick_at(0.5) # Last step of the cascade
+    assert harness.scheduler.is_idle() and not harness.timer_running
+    harness.tick_at(1.0)
+    assert not harness.timer_running and harness.timer_starts == 1
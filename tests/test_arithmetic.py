@@ -0,0 +1,50 @@
+"""Whole-number add/subtract/set_value/multiply/divide: results and operand checks."""
+import random
+from fractions import Fraction
+
+import pytest
+
+from abacus import Abacus
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_add_subtract_set_value_match_int_arithmetic(seed):
+    rng = random.Random(seed)
+    num_rods = rng.choice([1, 3, 13, 40])
+    abacus = Abacus(num_rods)
+    value = 0
+    for _ in range(300):
+        n = rng.randrange(-10 ** rng.randrange(1, num_rods + 1), 10 ** rng.randrange(1, num_rods + 1))
+        operation = rng.choice(["add", "subtract", "set_value"])
+        expected = {"add": value + n, "subtract": value - n, "set_value": n}[operation]
+        if not 0 <= expected < 10 ** num_rods:
+            state = bytes(abacus._state)
+            with pytest.raises(ValueError):
+                getattr(abacus, operation)(n)
+            assert abacus._state == state
+            continue
+        getattr(abacus, operation)(n)
+        value = expected
+        assert abacus.get_value() == value
+        assert abacus.get_value_str() == str(value)
+
+
+@pytest.mark.parametrize("operation", ["add", "subtract", "set_value", "multiply", "divide"])
+@pytest.mark.parametrize("operand", [1.5, 2.0, "3", Fraction(1, 2), None])
+def test_non_integer_operands_raise_before_any_rod_changes(operation, operand):
+    abacus = Abacus(3)
+    abacus.set_value(123)
+    state = bytes(abacus._state)
+    with pytest.raises(TypeError):
+        getattr(abacus, operation)(operand)
+    with pytest.raises(TypeError):
+        abacus.iter_steps(("set" if operation == "set_value" else operation, operand))
+    assert abacus._state == state
+    assert abacus.get_value() == 123 and abacus.get_value_str() == "123"
+
+
+def test_integer_like_operands_are_accepted():
+    abacus = Abacus(3)
+    abacus.set_value(True)
+    abacus.add(10)
+    assert abacus.get_value() == 11 and type(abacus.get_value()) is int
@@ -0,0 +1,81 @@
+"""AbacusBatch against one Abacus per row: same values, same bead states, same rows skipped."""
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from abacus import Abacus
+from abacus.batch import AbacusBatch
+from abacus.model import NUM_ROD_STATES
+
+
+def _random_abacus(rng, num_rods):
+    abacus = Abacus(num_rods)
+    if rng.random() < 0.5: # Any rod state, including rods showing 10-15
+        abacus._load_states(bytes(rng.randrange(NUM_ROD_STATES) for _ in range(num_rods)))
+    else:
+        abacus.set_value(rng.randrange(10 ** num_rods))
+    return abacus
+
+
+def _random_operand(rng, num_rods):
+    digits = rng.choice([1, 2, num_rods // 2 or 1, num_rods, num_rods + 1]) # Some rows overflow
+    operand = rng.randrange(10 ** digits)
+    return -operand if rng.random() < 0.2 else operand
+
+
+def _apply(abacus, method, operand):
+    try:
+        getattr(abacus, method)(operand)
+    except ValueError:
+        return False
+    return True
+
+
+@pytest.mark.parametrize("num_rods", [1, 5, 13, 18, 19, 40])
+@pytest.mark.parametrize("seed", range(3))
+def test_batch_matches_abacus_per_row(num_rods, seed):
+    rng = random.Random(seed * 100 + num_rods)
+    abaci = [_random_abacus(rng, num_rods) for _ in range(50)]
+    batch = AbacusBatch.from_abaci(abaci)
+    for _ in range(30):
+        method = rng.choice(["add", "subtract", "set_value"])
+        operands = [_random_operand(rng, num_rods) for _ in abaci]
+        if method == "set_value" and rng.random() < 0.5:
+            operands = [abs(operand) for operand in operands]
+        mask = [rng.random() < 0.8 for _ in abaci] if rng.random() < 0.5 else None
+        if num_rods >= 18 or rng.random() < 0.3: # 19-digit operands do not fit int64
+            operands = np.array(operands, dtype=object) # Python ints, as for operands past int64
+        else:
+            operands = np.array(operands, dtype=np.int64)
+
+        batch_method = "set_values" if method == "set_value" else method
+        applied = getattr(batch, batch_method)(operands, mask=mask)
+        expected = [(mask is None or mask[row]) and _apply(abacus, method, int(operands[row]))
+                    for row, abacus in enumerate(abaci)]
+        assert applied.tolist() == expected
+        assert batch.states.tobytes() == b"".join(bytes(abacus._state) for abacus in abaci)
+
+    values = batch.get_values()
+    assert values.dtype == (object if num_rods > 18 else np.int64)
+    assert [int(value) for value in values] == [abacus.get_value() for abacus in abaci]
+    for row in (0, len(abaci) - 1):
+        assert batch.to_abacus(row)._state == abaci[row]._state
+
+
+def test_shared_operand_and_reset_mask():
+    batch = AbacusBatch(4, num_rods=3)
+    batch.set_values([0, 5, 990, 999])
+    assert batch.add(10).tolist() == [True, True, False, False] # 999 + 10 and 990 + 10 overflow
+    assert batch.get_values().tolist() == [10, 15, 990, 999]
+    batch.reset(mask=[False, True, False, True])
+    assert batch.get_values().tolist() == [10, 0, 990, 0]
+    assert batch.subtract(11).tolist() == [False, False, True, False]
+    assert batch.get_values().tolist() == [10, 0, 979, 0]
+
+
+def test_empty_batch():
+    batch = AbacusBatch(0, num_rods=20)
+    assert len(batch) == 0 and batch.get_values().tolist() == []
+    assert batch.add(np.array([], dtype=object)).tolist() == []
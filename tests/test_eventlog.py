@@ -0,0 +1,90 @@
+import pytest
+
+from abacus import Abacus
+from abacus.eventlog import EventLogReader, EventLogWriter
+
+
+def _mixed_session(path, checkpoint_interval):
+    # Clicks with carry cascades interleaved with bulk writes, whose per-rod records
+    # are logged after every rod was already written
+    abacus = Abacus(6)
+    with EventLogWriter(path, abacus, checkpoint_interval=checkpoint_interval):
+        abacus.set_value(123456)
+        abacus.add(111111)
+        move, carry = (5, "earth", 4), False
+        abacus.set_value(999)
+        while move is not None and move[0] >= 0:
+            _, carry_info = abacus.apply_move(*move, carry=carry)
+            move, carry = (carry_info[:3] if carry_info else None), True
+        abacus.subtract(432)
+        abacus.apply_move(2, "heaven", 0)
+        abacus.reset()
+        abacus._load_states(bytes([1, 2, 3, 4, 5, 6]))
+        abacus.apply_move(0, "earth", 0)
+    return abacus
+
+
+def test_checkpoints_match_full_replay_at_every_record(tmp_path):
+    path = str(tmp_path / "session.abl")
+    for checkpoint_interval in (1, 2, 3, 5, 1 << 16):
+        abacus = _mixed_session(path, checkpoint_interval)
+        with EventLogReader(path) as log:
+            assert log.num_records > 20
+            for index in range(log.num_records + 1):
+                assert log.states_at(index) == log.states_at(index, use_checkpoints=False), (checkpoint_interval, index)
+            assert log.states_at(log.num_records) == abacus._state
+
+
+def test_bulk_write_checkpoint_holds_only_logged_rods(tmp_path):
+    path = str(tmp_path / "session.abl")
+    abacus = Abacus(6)
+    with EventLogWriter(path, abacus, checkpoint_interval=2):
+        abacus.set_value(123456)
+        abacus.add(111111)
+    with EventLogReader(path) as log:
+        assert log.replay(2).get_value() == 120000
+        assert log.replay().get_value() == 234567
+
+
+def test_truncated_log_reads_up_to_last_complete_record(tmp_path):
+    path = str(tmp_path / "session.abl")
+    _mixed_session(path, 4)
+    with EventLogReader(path) as log:
+        num_records = log.num_records
+        expected = log.states_at(num_records - 1)
+    with open(path, "r+b") as f:
+        f.truncate(f.seek(0, 2) - 3)
+    with EventLogReader(path) as log:
+        assert log.num_records == num_records - 1
+        assert log.states_at(log.num_records) == expected
+
+
+def test_log_is_readable_before_the_first_flush(tmp_path):
+    # A GUI session killed early never reaches close() or a full buffer
+    path = str(tmp_path / "session.abl")
+    abacus = Abacus(4)
+    abacus.set_value(1234)
+    writer = EventLogWriter(path, abacus)
+    abacus.apply_move(3, "earth", 4)
+    with EventLogReader(path) as log:
+        assert log.num_rods == 4 and log.num_records == 0 and log.num_checkpoints == 1
+        assert log.replay().get_value() == 1234
+    writer.close()
+    with EventLogReader(path) as log:
+        assert log.num_records > 0
+        assert log.replay().get_value() == abacus.get_value()
+
+
+@pytest.mark.parametrize("contents, message", [
+    (b"", "not an abacus event log"),
+    (b"ABEV\x01\x00", "not an abacus event log"),
+    (b"XXXX\x01\x00\x08\x00\x04\x00\x00\x00\x10\x00\x00\x00", "not an abacus event log"),
+    (b"ABEV\x01\x00\x08\x00\x04\x00\x00\x00\x00\x00\x00\x00", "not an abacus event log"), # Zero interval
+    (b"ABEV\x02\x00\x08\x00\x04\x00\x00\x00\x10\x00\x00\x00", "unsupported event log version 2"),
+])
+def test_bad_or_short_files_are_rejected(tmp_path, contents, message):
+    path = str(tmp_path / "bad.abl")
+    with open(path, "wb") as f:
+        f.write(contents)
+    with pytest.raises(ValueError, match=message):
+        EventLogReader(path)
@@ -0,0 +1,63 @@
+import io
+
+import pytest
+
+from abacus.headless import evaluate_line, iter_operations, iter_results, run_headless, trace_line
+
+
+@pytest.mark.parametrize("line, operations", [
+    ("1200 + 34 - 5", [("set", 1200), ("add", 34), ("subtract", 5)]),
+    ("  7+8-9  ", [("set", 7), ("add", 8), ("subtract", 9)]),
+    ("+5", [("add", 5)]),
+    ("-5 + 10", [("subtract", 5), ("add", 10)]),
+    ("set 7; add 8; sub 2; mul 3; div 4; subtract 1; multiply 2; divide 5",
+     [("set", 7), ("add", 8), ("subtract", 2), ("multiply", 3), ("divide", 4), ("subtract", 1),
+      ("multiply", 2), ("divide", 5)]),
+    ("SET 5; Add 1", [("set", 5), ("add", 1)]),
+    ("set 10; 3 + 4", [("set", 10), ("set", 3), ("add", 4)]),
+    ("set 1;; add 2;", [("set", 1), ("add", 2)]),
+])
+def test_iter_operations(line, operations):
+    assert list(iter_operations(line)) == operations
+
+
+@pytest.mark.parametrize("line, result", [
+    ("1200 + 34 - 5", "1229"),
+    ("set 7; add 8", "15"),
+    ("set 100; mul 3; div 7", "42"),
+    ("0", "0"),
+    ("9999999999999 + 1", "error: Result does not fit on the abacus"),
+    ("5 - 6", "error: Result would be negative"),
+    ("set 5; div 0", "error: Cannot divide by zero"),
+    ("1 2", "error: cannot parse '1 2'"),
+    ("1 + 2 3", "error: cannot parse '1 + 2 3'"),
+    ("1 +", "error: cannot parse '1 +'"),
+    ("add", "error: cannot parse 'add'"),
+    ("set 1.5", "error: cannot parse 'set 1.5'"),
+    ("1 * 2", "error: cannot parse '1 * 2'"),
+])
+def test_evaluate_line(line, result):
+    assert evaluate_line(line) == result
+
+
+def test_trace_line_ends_with_the_same_result():
+    lines = list(trace_line("set 95; add 7"))
+    assert lines[0] == "# set 95" and "# add 7" in lines
+    assert any("carry to" in line for line in lines)
+    assert lines[-1] == evaluate_line("set 95; add 7") == "102"
+    assert list(trace_line("1 2"))[-1] == "error: cannot parse '1 2'" # Steps before the bad term stream first
+
+
+def test_results_keep_input_order_across_workers():
+    lines = [f"{i} + {i}\n" for i in range(50)] + ["# comment\n", "\n", "1 2\n"]
+    expected = [str(2 * i) for i in range(50)] + ["error: cannot parse '1 2'"]
+    assert list(iter_results(lines, workers=1, chunk_size=7)) == expected
+    assert list(iter_results(lines, workers=2, chunk_size=7)) == expected
+
+
+def test_run_headless_reads_a_file(tmp_path):
+    path = tmp_path / "input.txt"
+    path.write_text("1200 + 34 - 5\n1 2\nset 3; mul 4\n", encoding="utf-8")
+    output = io.StringIO()
+    assert run_headless(str(path), workers=1, output=output) == 0
+    assert output.getvalue() == "1229\nerror: cannot parse '1 2'\n12\n"
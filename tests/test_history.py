@@ -0,0 +1,165 @@
+"""Undo/redo history: random sessions checked against the state recorded at every position."""
+import random
+
+import pytest
+
+from abacus import Abacus
+from abacus.eventlog import EventLogReader, EventLogWriter
+from abacus.history import History
+from abacus.model import _BEAD_SLOTS
+
+
+class Session:
+    """Random edits of every kind, remembering the rod states after each history position."""
+
+    def __init__(self, rng, abacus, history):
+        self.rng = rng
+        self.abacus = abacus
+        self.history = history
+        self.states = {history.position: bytes(abacus._state)}
+
+    def edit(self, count):
+        rng, abacus = self.rng, self.abacus
+        for _ in range(count):
+            r = rng.random()
+            try:
+                if r < 0.5: # A click and its whole carry cascade
+                    for _ in abacus.iter_steps(("move", rng.randrange(abacus.num_rods), *rng.choice(list(_BEAD_SLOTS)))):
+                        pass
+                elif r < 0.6:
+                    abacus.add(rng.randrange(10 ** 5))
+                elif r < 0.65:
+                    for _ in abacus.iter_steps(("subtract", rng.randrange(10 ** 3))):
+                        pass
+                elif r < 0.7:
+                    abacus.multiply(rng.randrange(3))
+                elif r < 0.75:
+                    abacus.set_value(rng.randrange(10 ** abacus.num_rods))
+                elif r < 0.77:
+                    abacus.reset()
+                elif r < 0.85:
+                    abacus.rods[rng.randrange(abacus.num_rods)]["earth_beads"][rng.randrange(5)] = rng.randrange(2)
+                elif r < 0.9:
+                    abacus.rods[rng.randrange(abacus.num_rods)]["heaven_beads"] = [rng.randrange(2), rng.randrange(2)]
+                else:
+                    abacus.apply_changes(rng.randrange(abacus.num_rods), [("heaven", 0, rng.randrange(2))])
+            except ValueError:
+                pass # Result did not fit; nothing changed
+            # New work after undo() drops the redo branch (a write that changed nothing keeps it)
+            for position in [position for position in self.states if position > self.history.newest]:
+                del self.states[position]
+            self.states[self.history.position] = bytes(self.abacus._state)
+
+    def check(self):
+        assert bytes(self.abacus._state) == self.states[self.history.position]
+        assert self.abacus.get_value() == Abacus.get_value(self.abacus)
+        fresh = Abacus(self.abacus.num_rods)
+        fresh._load_states(self.abacus._state)
+        assert self.abacus.get_value() == fresh.get_value() # Digit cache kept in step
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_random_sessions_reach_every_position(seed, tmp_path):
+    rng = random.Random(seed)
+    abacus = Abacus(rng.choice([3, 9, 40]))
+    abacus.set_value(rng.randrange(10 ** abacus.num_rods))
+    history = History(abacus, snapshot_interval=rng.choice([1, 4, 16]), max_bytes=rng.choice([1 << 30, 3000]))
+    log = EventLogWriter(str(tmp_path / "session.abl"), abacus, checkpoint_interval=50)
+    session = Session(rng, abacus, history)
+    session.edit(300)
+
+    for _ in range(300):
+        r = rng.random()
+        if r < 0.3:
+            history.undo()
+        elif r < 0.6:
+            history.redo()
+        elif r < 0.8:
+            history.goto(rng.randint(history.oldest, history.newest))
+        else:
+            session.edit(rng.randrange(1, 5))
+        session.check()
+
+    # Every retained position, in an order that mixes short steps and snapshot jumps
+    positions = list(range(history.oldest, history.newest + 1))
+    rng.shuffle(positions)
+    for position in positions:
+        history.goto(position)
+        session.check()
+    if history.max_bytes < 1 << 20:
+        assert history.oldest > 0 # Evicted
+        assert history.memory_bytes() <= history.max_bytes
+
+    # The event log saw every write, undo and redo included
+    log.close()
+    with EventLogReader(log.path) as reader:
+        assert reader.replay()._state == abacus._state
+    history.close()
+    assert abacus.recorder is None
+
+
+def test_new_work_after_undo_drops_the_redo_branch():
+    abacus = Abacus(5)
+    history = History(abacus, snapshot_interval=2)
+    for value in (1, 2, 3, 4, 5):
+        abacus.set_value(value)
+    assert history.position == history.newest == 5
+    history.undo()
+    history.undo()
+    assert abacus.get_value() == 3 and history.can_redo()
+    abacus.add(10)
+    assert history.position == history.newest == 4
+    assert not history.can_redo() and history.redo() is None
+    assert abacus.get_value() == 13
+    assert [history.goto(n) is not None and abacus.get_value() for n in range(5)] == [0, 1, 2, 3, 13]
+
+
+def test_click_and_cascade_undo_together():
+    abacus = Abacus(5)
+    abacus.set_value(99)
+    history = History(abacus)
+    steps = list(abacus.iter_steps(("move", 4, "earth", 4)))
+    assert len(steps) > 1 and abacus.get_value() != 99
+    assert history.undo() == sorted({rod_index for rod_index, changes, _ in steps if changes})
+    assert abacus.get_value() == 99 and history.position == 0
+
+
+def test_bead_and_group_writes_are_separate_steps():
+    abacus = Abacus(3)
+    history = History(abacus)
+    abacus.rods[2]["earth_beads"][0] = 1
+    abacus.rods[2]["earth_beads"][1] = 1
+    abacus.rods[2]["heaven_beads"] = [0, 1]
+    assert abacus.get_value() == 7 and history.position == 3
+    history.undo()
+    assert abacus.get_value() == 2
+    history.undo()
+    assert abacus.get_value() == 1
+
+
+def test_eviction_keeps_the_latest_operation_and_stays_under_the_cap():
+    abacus = Abacus(40)
+    history = History(abacus, snapshot_interval=8, max_bytes=4000)
+    for i in range(1, 2001):
+        abacus.set_value(i * 7919 % 10 ** 40)
+    assert history.oldest > 0 and history.newest == history.position == 2000
+    assert history.memory_bytes() <= 4000
+    assert all(number >= history.oldest for number in history._snapshots)
+    history.goto(history.oldest)
+    assert abacus.get_value() == history.oldest * 7919 % 10 ** 40
+    with pytest.raises(IndexError):
+        history.goto(history.oldest - 1)
+    history.goto(history.newest)
+    assert abacus.get_value() == 2000 * 7919 % 10 ** 40
+
+
+def test_goto_returns_changed_rods_and_no_op_writes_are_not_operations():
+    abacus = Abacus(4)
+    history = History(abacus)
+    abacus.set_value(1200)
+    abacus.set_value(1200) # Nothing changed
+    assert history.position == 1
+    abacus.set_value(1234)
+    assert history.goto(0) == [0, 1, 2, 3]
+    assert history.goto(1) == [0, 1]
+    assert history.goto(1) == []
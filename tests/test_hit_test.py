@@ -0,0 +1,95 @@
+import pytest
+
+pytest.importorskip("PyQt6.QtWidgets")
+
+from PyQt6.QtCore import QEvent, QPointF, Qt
+from PyQt6.QtGui import QMouseEvent
+from PyQt6.QtWidgets import QApplication
+
+from abacus.model import _BEAD_SLOTS, _DIGIT_STATES
+from ui.abacus_widget import AbacusWidget
+
+# Widget sizes: the window's default (800x527), the minimum height and a taller one,
+# plus a wide abacus in viewport mode
+SIZES = [(13, 800, 527), (13, 800, 400), (13, 800, 600), (9, 1000, 450), (60, 800, 527)]
+
+# One rod state per bead and position: that bead moved there, every other bead at 0
+ISOLATED_STATES = [(bead_type, bead_index, bead_pos, (1 << slot) if bead_pos else 0)
+                   for (bead_type, bead_index), slot in _BEAD_SLOTS.items() for bead_pos in (0, 1)]
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def _widget(app, num_rods, width, height):
+    widget = AbacusWidget(num_rods=num_rods)
+    widget.resize(width, height)
+    widget.animation.instant = True
+    widget.show()
+    app.processEvents()
+    return widget
+
+
+def _center(layout, rod_index, bead_type, bead_index, bead_pos):
+    x, y, width, height = layout.bead_rect(rod_index, bead_type, bead_index, bead_pos)
+    return x + width / 2, y + height / 2
+
+
+def _visible_rods(widget, layout):
+    if layout.viewport_mode:
+        widget.ensure_rod_visible(widget.num_rods // 2)
+        layout = widget._get_layout()
+        return layout, [i for i in layout.visible_rods()
+                        if layout.frame_margin + layout.bead_size <= layout.rod_x(i)
+                        <= layout.width - layout.frame_margin - layout.bead_size]
+    return layout, range(widget.num_rods)
+
+
+@pytest.mark.parametrize("num_rods, width, height", SIZES)
+def test_every_drawn_bead_hits_itself(app, num_rods, width, height):
+    widget = _widget(app, num_rods, width, height)
+    abacus = widget.abacus
+    layout, rods = _visible_rods(widget, widget._get_layout())
+    assert layout.height == height and len(rods) > 0
+    # Every bead setting a click or add() can produce, plus each bead alone in each position
+    states = [state for state in _DIGIT_STATES] + [state for *_, state in ISOLATED_STATES]
+    for state in states:
+        for rod_index in rods:
+            abacus._set_rod_state(rod_index, state)
+        for rod_index in rods:
+            for bead_type, bead_index in _BEAD_SLOTS:
+                bead_pos = abacus.rods[rod_index][bead_type + '_beads'][bead_index]
+                x, y = _center(layout, rod_index, bead_type, bead_index, bead_pos)
+                assert layout.hit_test(x, y, abacus.rods) == (rod_index, bead_type, bead_index), \
+                    (state, bead_type, bead_index, bead_pos)
+
+
+@pytest.mark.parametrize("num_rods, width, height", SIZES)
+def test_every_bead_position_is_hit(app, num_rods, width, height):
+    widget = _widget(app, num_rods, width, height)
+    layout, rods = _visible_rods(widget, widget._get_layout())
+    for bead_type, bead_index, bead_pos, state in ISOLATED_STATES:
+        for rod_index in rods:
+            widget.abacus._set_rod_state(rod_index, state)
+            x, y = _center(layout, rod_index, bead_type, bead_index, bead_pos)
+            assert layout.hit_test(x, y, widget.abacus.rods) == (rod_index, bead_type, bead_index)
+
+
+def test_click_on_lowered_five_bead_takes_it_away(app):
+    widget = _widget(app, 13, 800, 527)
+    widget.abacus.set_value(5)
+    x, y = _center(widget._get_layout(), 12, "heaven", 1, 1)
+    position = QPointF(x, y)
+    event = QMouseEvent(QEvent.Type.MouseButtonPress, position, position, Qt.MouseButton.LeftButton,
+                        Qt.MouseButton.LeftButton, Qt.KeyboardModifier.NoModifier)
+    widget.mousePressEvent(event)
+    assert widget.abacus.get_value() == 0
+
+
+def test_hit_test_misses_outside_beads(app):
+    widget = _widget(app, 13, 800, 527)
+    layout = widget._get_layout()
+    assert layout.hit_test(5, 200, widget.abacus.rods) is None # Left margin
+    assert layout.hit_test(layout.rod_x(0), layout.beam_y + layout.beam_height / 2, widget.abacus.rods) is None
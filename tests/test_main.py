@@ -0,0 +1,20 @@
+"""Command-line parsing of the GUI options; nothing here opens a window."""
+import pytest
+
+from main import parse_gui_args
+
+
+def test_gui_options_are_parsed_and_qt_options_passed_through():
+    args, qt_args = parse_gui_args(["-platform", "offscreen", "--rods", "20", "--stats", "--stats-out", "s.json",
+                                    "-style=fusion", "--record", "r.abl", "--startup-timing"])
+    assert (args.rods, args.record, args.stats, args.stats_out) == (20, "r.abl", True, "s.json")
+    assert args.startup_timing and not args.exit_after_startup
+    assert qt_args == ["-platform", "offscreen", "-style=fusion"]
+
+
+@pytest.mark.parametrize("argv", [["--rods"], ["--rods", "x"], ["--record"]])
+def test_bad_gui_options_exit_with_usage(argv, capsys):
+    with pytest.raises(SystemExit) as exc:
+        parse_gui_args(argv)
+    assert exc.value.code == 2
+    assert "usage:" in capsys.readouterr().err
@@ -0,0 +1,125 @@
+"""multiply()/divide() and their suanpan step traces, checked against Python int arithmetic."""
+import random
+
+import pytest
+
+from abacus import Abacus
+from abacus.model import _BEAD_SLOTS
+
+
+def _run_trace(abacus, operation):
+    for rod_index, changes, carry_info in abacus.iter_steps(operation):
+        assert 0 <= rod_index < abacus.num_rods
+        assert abacus.get_value() >= 0
+
+
+def _pair(num_rods, value, disturb=()):
+    # Two abaci in the same bead state; `disturb` moves leave non-canonical rods behind
+    abaci = (Abacus(num_rods), Abacus(num_rods))
+    for abacus in abaci:
+        abacus.set_value(value)
+        for move in disturb:
+            abacus.apply_move(*move)
+    return abaci
+
+
+def _random_cases(seed, count):
+    rng = random.Random(seed)
+    for _ in range(count):
+        num_rods = rng.choice([3, 5, 13, 30])
+        value = rng.randrange(10 ** rng.randrange(0, num_rods + 1))
+        disturb = [(rng.randrange(num_rods), *rng.choice(list(_BEAD_SLOTS))) for _ in range(rng.randrange(3))]
+        yield num_rods, value, disturb, rng.randrange(10 ** rng.randrange(1, 6))
+
+
+@pytest.mark.parametrize("num_rods, value, disturb, n", list(_random_cases(7, 800)))
+def test_multiply_matches_int_arithmetic(num_rods, value, disturb, n):
+    fast, traced = _pair(num_rods, value, disturb)
+    value = fast.get_value()
+    expected = value * n
+    if expected >= 10 ** num_rods:
+        with pytest.raises(ValueError):
+            fast.multiply(n)
+        with pytest.raises(ValueError):
+            traced.iter_steps(("multiply", n))
+        assert fast.get_value() == traced.get_value() == value # Nothing was touched
+        return
+    fast.multiply(n)
+    _run_trace(traced, ("multiply", n))
+    assert fast.get_value() == traced.get_value() == expected
+    assert fast._state == traced._state # Both paths end in the same bead state
+
+
+@pytest.mark.parametrize("num_rods, value, disturb, n", list(_random_cases(11, 800)))
+def test_divide_matches_divmod(num_rods, value, disturb, n):
+    n += 1 # Divisors start at 1
+    fast, traced = _pair(num_rods, value, disturb)
+    value = fast.get_value()
+    quotient, remainder = divmod(value, n)
+    assert fast.divide(n)[0] == remainder
+    assert fast.get_value() == quotient
+    # Quotient figures are parked len(divisor) rods to the left of where they end up
+    if quotient * 10 ** len(str(n)) < 10 ** num_rods:
+        _run_trace(traced, ("divide", n))
+        assert traced.get_value() == quotient
+        assert fast._state == traced._state
+    else:
+        with pytest.raises(ValueError, match="free rod"):
+            traced.iter_steps(("divide", n))
+
+
+@pytest.mark.parametrize("value, n", [(1234, 56), (999, 999), (1, 1), (0, 987), (4321, 0), (123456789, 9)])
+def test_multiply_examples(value, n):
+    fast, traced = _pair(13, value)
+    fast.multiply(n)
+    _run_trace(traced, ("multiply", n))
+    assert fast.get_value() == traced.get_value() == value * n
+    assert fast._state == traced._state
+
+
+@pytest.mark.parametrize("value, n", [(1234 * 56, 56), (100, 7), (999, 1000), (0, 3), (123456789012, 1), (97, 97)])
+def test_divide_examples(value, n):
+    fast, traced = _pair(13, value)
+    remainder, _ = fast.divide(n)
+    _run_trace(traced, ("divide", n))
+    assert (fast.get_value(), remainder) == divmod(value, n)
+    assert traced.get_value() == value // n
+    assert fast._state == traced._state
+
+
+def test_divide_trace_needs_a_free_rod_on_the_left():
+    abacus = Abacus(5)
+    abacus.set_value(98765)
+    with pytest.raises(ValueError, match="free rod"):
+        abacus.iter_steps(("divide", 7))
+    assert abacus.get_value() == 98765
+    assert abacus.divide(7, record_changes=False) == (98765 % 7, None)
+    assert abacus.get_value() == 98765 // 7
+
+
+@pytest.mark.parametrize("operation, message", [
+    (("divide", 0), "zero"),
+    (("divide", -3), "negative"),
+    (("multiply", -1), "negative"),
+    (("multiply", 10 ** 12), "does not fit"),
+])
+def test_invalid_operands_raise_before_any_step(operation, message):
+    abacus = Abacus(5)
+    abacus.set_value(12)
+    with pytest.raises(ValueError, match=message):
+        abacus.iter_steps(operation)
+    with pytest.raises(ValueError, match=message):
+        getattr(abacus, operation[0])(operation[1])
+    assert abacus.get_value() == 12
+
+
+def test_trace_can_be_paused_and_resumed():
+    abacus = Abacus(13)
+    abacus.set_value(98765)
+    steps = abacus.iter_steps(("multiply", 4321))
+    next(steps)
+    middle = abacus.get_value()
+    assert middle != 98765 # The first step is already applied
+    for _ in steps:
+        pass
+    assert abacus.get_value() == 98765 * 4321
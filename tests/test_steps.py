@@ -0,0 +1,77 @@
+"""iter_steps() run to completion against the eager methods, from any rod states.
+
+Division is left to test_multiply_divide.py: its step-by-step form needs a free
+rod that divide() does not.
+"""
+import random
+
+import pytest
+
+from abacus import Abacus
+from abacus.model import NUM_ROD_STATES, _BEAD_SLOTS
+
+
+def _random_states(rng, num_rods):
+    # Non-canonical rods (more than four earth beads up, values 10-15) included
+    return bytes(rng.randrange(NUM_ROD_STATES) for _ in range(num_rods))
+
+
+def _move_with_cascade(abacus, rod_index, bead_type, bead_index):
+    changes, carry_info = abacus.apply_move(rod_index, bead_type, bead_index)
+    while carry_info is not None and carry_info[0] >= 0:
+        changes, carry_info = abacus.apply_move(*carry_info[:3], carry=True)
+
+
+def _run_eager(abacus, operation):
+    kind = operation[0]
+    if kind == "move":
+        return _move_with_cascade(abacus, *operation[1:])
+    method = {"add": abacus.add, "subtract": abacus.subtract, "set": abacus.set_value,
+              "multiply": abacus.multiply}[kind]
+    return method(operation[1])
+
+
+def _random_operation(rng, num_rods):
+    kind = rng.choice(["move", "move", "add", "subtract", "set", "multiply"])
+    if kind == "move":
+        return ("move", rng.randrange(num_rods), *rng.choice(list(_BEAD_SLOTS)))
+    if kind == "multiply":
+        return (kind, rng.randrange(30))
+    return (kind, rng.randrange(10 ** rng.randrange(1, num_rods + 2)))
+
+
+@pytest.mark.parametrize("num_rods", [1, 4, 13, 30])
+@pytest.mark.parametrize("seed", range(4))
+def test_iter_steps_matches_the_eager_methods(num_rods, seed):
+    rng = random.Random(seed * 100 + num_rods)
+    for _ in range(200):
+        states = _random_states(rng, num_rods)
+        eager, stepped = Abacus(num_rods), Abacus(num_rods)
+        eager._load_states(states)
+        stepped._load_states(states)
+        operation = _random_operation(rng, num_rods)
+
+        try:
+            _run_eager(eager, operation)
+        except ValueError:
+            with pytest.raises(ValueError):
+                stepped.iter_steps(operation)
+            assert eager._state == stepped._state == states # Neither touched a rod
+            continue
+        for _ in stepped.iter_steps(operation):
+            pass
+        assert stepped._state == eager._state, operation
+        assert stepped.get_value() == eager.get_value()
+        assert stepped.get_value_str() == eager.get_value_str()
+
+
+def test_steps_and_change_log_agree_on_non_canonical_rods():
+    states = bytes([0, 127, 5, 31]) # Rods showing 0, 15, 6 and 13: value 1573
+    eager, stepped = Abacus(4), Abacus(4)
+    eager._load_states(states)
+    stepped._load_states(states)
+    change_log = eager.add(7)
+    steps = list(stepped.iter_steps(("add", 7)))
+    assert [(rod_index, changes) for rod_index, changes, _ in steps] == change_log
+    assert stepped._state == eager._state
+    assert eager.get_value() == 1580
@@ -0,0 +1,167 @@
+"""Round trips through abacus.store for odd rod counts and every bead configuration."""
+import pytest
+
+from abacus import Abacus, NUM_ROD_STATES
+from abacus import store
+
+np = pytest.importorskip("numpy")
+
+from abacus import AbacusBatch # noqa: E402 (batches need NumPy)
+
+ROD_COUNTS = [1, 3, 7, 13, 101]
+
+
+def _every_configuration(num_rods):
+    # 128 abaci; across them every rod takes each of the 128 packed states once
+    abaci = []
+    for k in range(NUM_ROD_STATES):
+        abacus = Abacus(num_rods)
+        abacus._load_states(bytes((k + 37 * rod_index) % NUM_ROD_STATES for rod_index in range(num_rods)))
+        abaci.append(abacus)
+    return abaci
+
+
+def _assert_same(loaded, expected):
+    assert loaded.num_rods == expected.num_rods
+    assert loaded._state == expected._state
+    assert loaded._digits == expected._digits
+    assert loaded.get_value() == expected.get_value()
+    assert [list(rod["heaven_beads"]) + list(rod["earth_beads"]) for rod in loaded.rods] == \
+        [list(rod["heaven_beads"]) + list(rod["earth_beads"]) for rod in expected.rods]
+
+
+@pytest.mark.parametrize("num_rods", ROD_COUNTS)
+def test_save_load_single_abacus(tmp_path, num_rods):
+    path = str(tmp_path / "one.abs")
+    for abacus in _every_configuration(num_rods):
+        store.save(abacus, path)
+        _assert_same(store.load(path), abacus)
+
+
+@pytest.mark.parametrize("num_rods", ROD_COUNTS)
+def test_save_many_abaci_and_store_get(tmp_path, num_rods):
+    path = str(tmp_path / "many.abs")
+    abaci = _every_configuration(num_rods)
+    store.save_many(abaci, path)
+    with open(path, "rb") as f:
+        assert len(f.read()) == 12 + num_rods * len(abaci)
+    for index in (0, 1, 64, len(abaci) - 1):
+        _assert_same(store.load(path, index), abaci[index])
+    with store.StateStore(path) as states:
+        assert len(states) == len(abaci) and states.num_rods == num_rods
+        for index, abacus in enumerate(abaci):
+            assert states.states_at(index) == abacus._state
+            _assert_same(states.get(index), abacus)
+
+
+@pytest.mark.parametrize("num_rods", ROD_COUNTS)
+def test_batch_round_trip_and_zero_copy_view(tmp_path, num_rods):
+    abaci = _every_configuration(num_rods)
+    from_abaci, from_batch, from_strided = (str(tmp_path / name) for name in ("a.abs", "b.abs", "c.abs"))
+    batch = AbacusBatch.from_abaci(abaci)
+    store.save_many(abaci, from_abaci)
+    store.save_many(batch, from_batch)
+    store.save_many(AbacusBatch.from_states(np.asfortranarray(batch.states)), from_strided)
+    with open(from_abaci, "rb") as a, open(from_batch, "rb") as b, open(from_strided, "rb") as c:
+        assert a.read() == b.read() == c.read()
+
+    with store.StateStore(from_batch) as states:
+        view = states.batch()
+        assert not view.states.flags.owndata and not view.states.flags.writeable
+        assert (view.states == batch.states).all()
+        assert [int(value) for value in view.get_values()] == [abacus.get_value() for abacus in abaci]
+        part = states.batch(10, 20)
+        assert len(part) == 10
+        _assert_same(part.to_abacus(0), abaci[10])
+        assert len(states.batch(5, 10_000)) == len(abaci) - 5
+        del view, part
+
+
+def test_write_through_and_copy_on_write_modes(tmp_path):
+    path = str(tmp_path / "values.abs")
+    batch = AbacusBatch(100, 13)
+    batch.set_values(np.arange(100, dtype=np.int64) * 7)
+    store.save_many(batch, path)
+
+    states = store.StateStore(path, "r+")
+    view = states.batch()
+    view.add(1)
+    del view
+    states.close()
+    with store.StateStore(path) as states:
+        assert [int(value) for value in states.batch().get_values()] == [i * 7 + 1 for i in range(100)]
+
+    states = store.StateStore(path, "c")
+    view = states.batch()
+    view.add(1)
+    states.close() # The mapping stays alive while the view does
+    assert int(view.get_values()[1]) == 9
+    del view
+    assert store.load(path, 1).get_value() == 8
+
+
+def test_truncated_tail_keeps_complete_states(tmp_path):
+    path = str(tmp_path / "cut.abs")
+    abaci = _every_configuration(7)[:10]
+    store.save_many(abaci, path)
+    with open(path, "ab") as f:
+        f.write(b"\x01\x02\x03") # Part of an eleventh state
+    with store.StateStore(path) as states:
+        assert len(states) == 10
+        _assert_same(states.get(9), abaci[9])
+        with pytest.raises(IndexError):
+            states.get(10)
+    with pytest.raises(IndexError):
+        store.load(path, 10)
+
+
+def test_header_only_file_has_no_states(tmp_path):
+    path = str(tmp_path / "empty.abs")
+    with store.StateWriter(path, 13) as writer:
+        assert writer.states_written == 0
+    with store.StateStore(path) as states:
+        assert len(states) == 0 and states.num_rods == 13
+        assert len(states.batch()) == 0
+        with pytest.raises(IndexError):
+            states.get(0)
+    with pytest.raises(IndexError):
+        store.load(path)
+
+
+@pytest.mark.parametrize("contents, message", [
+    (b"", "not an abacus state file"),
+    (b"AB", "not an abacus state file"),
+    (b"XXXX\x01\x00\x00\x00\x03\x00\x00\x00", "not an abacus state file"),
+    (b"ABST\x01\x00\x00\x00\x00\x00\x00\x00", "not an abacus state file"), # Zero rods
+    (b"ABST\x02\x00\x00\x00\x03\x00\x00\x00", "unsupported abacus state file version 2"),
+])
+def test_bad_headers_are_rejected(tmp_path, contents, message):
+    path = str(tmp_path / "bad.abs")
+    with open(path, "wb") as f:
+        f.write(contents)
+    for mode in ("r", "r+", "c"):
+        with pytest.raises(ValueError, match=message):
+            store.StateStore(path, mode)
+    with pytest.raises(ValueError, match=message):
+        store.load(path)
+
+
+def test_invalid_rod_state_is_rejected(tmp_path):
+    path = str(tmp_path / "bad.abs")
+    with open(path, "wb") as f:
+        f.write(b"ABST\x01\x00\x00\x00\x02\x00\x00\x00" + bytes([0, NUM_ROD_STATES]))
+    with pytest.raises(ValueError, match="invalid rod state"):
+        store.load(path)
+    with store.StateStore(path) as states:
+        with pytest.raises(ValueError, match="invalid rod state"):
+            states.get(0)
+
+
+def test_mismatched_rod_counts_are_rejected(tmp_path):
+    with store.StateWriter(str(tmp_path / "mixed.abs"), 5) as writer:
+        with pytest.raises(ValueError):
+            writer.append(Abacus(6))
+        with pytest.raises(ValueError):
+            writer.append_batch(AbacusBatch(2, 4))
+    with pytest.raises(ValueError):
+        store.save_many([], str(tmp_path / "none.abs"))
@@ -0,0 +1,67 @@
+"""Pins Abacus.move_bead() to the original branching implementation.
+
+data/move_bead_baseline.json holds the output of the baseline commit's
+Abacus.move_bead() for every 7-bit rod state and every clicked bead, as
+[state, bead_type, bead_index, changes, carry_info] for a click on rod 5 of a
+6-rod abacus. It was generated once from that code and is not derived from
+anything in the current tree.
+"""
+import json
+import os
+
+import pytest
+
+from abacus import Abacus, NUM_ROD_STATES
+from abacus.model import _BEAD_SLOTS
+
+BASELINE_ROD = 5
+
+with open(os.path.join(os.path.dirname(__file__), "data", "move_bead_baseline.json"), encoding="utf-8") as f:
+    BASELINE = json.load(f)
+
+
+def _apply(state, changes):
+    for bead_type, bead_index, new_position in changes:
+        bit = 1 << _BEAD_SLOTS[(bead_type, bead_index)]
+        state = state | bit if new_position else state & ~bit
+    return state
+
+
+def test_baseline_covers_every_state_and_bead():
+    assert len(BASELINE) == NUM_ROD_STATES * len(_BEAD_SLOTS) == 896
+    assert {(state, bead_type, bead_index) for state, bead_type, bead_index, *_ in BASELINE} == \
+        {(state, *bead) for state in range(NUM_ROD_STATES) for bead in _BEAD_SLOTS}
+
+
+@pytest.mark.parametrize("use_transition_table", [True, False], ids=["table", "branching"])
+def test_move_bead_matches_baseline(use_transition_table):
+    abacus = Abacus(BASELINE_ROD + 1, use_transition_table=use_transition_table)
+    for state, bead_type, bead_index, expected_changes, expected_carry in BASELINE:
+        abacus._set_rod_state(BASELINE_ROD, state)
+        changes, carry_info = abacus.move_bead(BASELINE_ROD, bead_type, bead_index)
+        assert [list(change) for change in changes] == expected_changes, (state, bead_type, bead_index)
+        assert (list(carry_info) if carry_info else None) == expected_carry, (state, bead_type, bead_index)
+        assert abacus._state[BASELINE_ROD] == state # move_bead() only reports the move
+
+        abacus.apply_changes(BASELINE_ROD, changes)
+        assert abacus._state[BASELINE_ROD] == _apply(state, expected_changes)
+
+
+def test_move_bead_returns_a_private_copy_of_the_changes():
+    abacus = Abacus(1)
+    changes, _ = abacus.move_bead(0, "earth", 2)
+    changes.clear()
+    assert abacus.move_bead(0, "earth", 2)[0] == [("earth", 0, 1), ("earth", 1, 1), ("earth", 2, 1)]
+
+
+@pytest.mark.parametrize("use_transition_table", [True, False], ids=["table", "branching"])
+def test_invalid_clicks_raise_like_the_baseline(use_transition_table):
+    abacus = Abacus(2, use_transition_table=use_transition_table)
+    with pytest.raises(IndexError):
+        abacus.move_bead(2, "earth", 0)
+    with pytest.raises(IndexError):
+        abacus.move_bead(0, "heaven", 2)
+    with pytest.raises(IndexError):
+        abacus.move_bead(0, "earth", 5)
+    with pytest.raises(ValueError):
+        abacus.move_bead(0, "sky", 0)
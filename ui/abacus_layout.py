@@ -0,0 +1,170 @@
+class AbacusLayout:
+    """Geometry of an AbacusWidget for one widget size and rod count.
+
+    Built once per resize (or rod count change) and shared by paintEvent and
+    mousePressEvent, so both agree on where every rod and bead is drawn.
+    Plain Python, no Qt types, so it can be built and queried without a display.
+
+    With rod_pitch=None all rods are fitted into the width. With a rod_pitch the
+    rods keep that fixed spacing and the frame becomes a window onto them,
+    scrolled horizontally by `scroll_x` (viewport mode). Rod positions are
+    computed arithmetically, so nothing here grows with the rod count.
+    """
+
+    def __init__(self, width, height, num_rods, frame_margin, beam_height, bead_radius, bead_spacing,
+                 rod_pitch=None):
+        self.width = width
+        self.height = height
+        self.num_rods = num_rods
+        self.frame_margin = frame_margin
+        self.beam_height = beam_height
+        self.bead_radius = bead_radius
+        self.bead_size = bead_radius * 2
+
+        self.abacus_width = width - 2 * frame_margin
+        self.abacus_height = height - 2 * frame_margin
+        self.beam_y = frame_margin + self.abacus_height / 4 # Adjusted for elongation
+        self.rod_top = frame_margin + 10
+        self.rod_bottom = height - frame_margin - 10
+
+        # Rod x-centers are frame_margin + (i + 1) * rod_spacing - scroll_x, see rod_x()
+        self.viewport_mode = rod_pitch is not None
+        if self.viewport_mode:
+            self.rod_spacing = rod_pitch
+            content_width = (num_rods + 1) * rod_pitch
+            self.max_scroll = max(0, int(content_width - self.abacus_width + 0.999))
+        else:
+            self.rod_spacing = self.abacus_width / (num_rods + 1)
+            self.max_scroll = 0
+        self.scroll_x = 0 # Set by the widget; always 0 when all rods fit
+
+        # Top y of every bead in both positions: bead_ys[bead_type][bead_index] = (y when 0, y when 1)
+        heaven_ys = (
+            # Top heaven bead: top of frame + frame thickness / top of beam - bead height - small offset
+            (frame_margin + 10, int(self.beam_y - self.bead_size - 5)),
+            # Bottom heaven bead: below the top one / touching the beam
+            (frame_margin + 10 + self.bead_size + 5, int(self.beam_y - self.bead_size)),
+        )
+        earth_ys = tuple(
+            # Earth beads are "down" (0) at the bottom of the section and "up" (1) against the beam
+            (int(height - frame_margin - (5 - j) * bead_spacing - 5),
+             int(self.beam_y + beam_height + 5 + j * bead_spacing))
+            for j in range(5)
+        )
+        self.bead_ys = {"heaven": heaven_ys, "earth": earth_ys}
+
+        # Vertical extent of a rod's column: every bead position plus 1px for the bead outline
+        all_ys = [y for ys in (heaven_ys, earth_ys) for pair in ys for y in pair]
+        self.column_top = min(min(all_ys), self.rod_top) - 1
+        self.column_bottom = max(max(all_ys) + self.bead_size, self.rod_bottom) + 1
+        self.column_half_width = bead_radius + 1
+
+        self._row_hits = self._build_row_hits()
+
+    def _build_row_hits(self):
+        """Maps every pixel row to the bead rectangles covering it.
+
+        A bead is hit in either of its positions. Heaven beads only count above the
+        beam and earth beads only below it. Each row lists (distance from the row to
+        the rectangle's center, bead_type, bead_index, bead_pos), nearest first, for
+        hit_test() to resolve rows where rectangles overlap.
+        """
+        row_hits = [()] * (self.height + 1)
+        earth_top = self.beam_y + self.beam_height
+        for bead_type, in_section in (("heaven", lambda row: row < self.beam_y),
+                                      ("earth", lambda row: row > earth_top)):
+            for bead_index, ys in enumerate(self.bead_ys[bead_type]):
+                for bead_pos, y in enumerate(ys):
+                    for row in range(max(y, 0), min(y + self.bead_size, self.height) + 1):
+                        if in_section(row):
+                            distance = abs(row - (y + self.bead_radius))
+                            row_hits[row] += ((distance, bead_type, bead_index, bead_pos),)
+        return [tuple(sorted(hits)) for hits in row_hits]
+
+    def rod_x(self, rod_index):
+        """On-screen x-center of a rod (outside the frame when scrolled out of view)."""
+        return int(self.frame_margin + (rod_index + 1) * self.rod_spacing - self.scroll_x)
+
+    def _first_rod_from(self, x, inclusive=True):
+        """Index of the first rod whose x-center is >= x (or > x), num_rods if none."""
+        num_rods = self.num_rods
+        if self.rod_spacing > 0:
+            # Arithmetic estimate, then a step or two to absorb int() rounding in rod_x()
+            rod_index = int((x + self.scroll_x - self.frame_margin) // self.rod_spacing) - 1
+            rod_index = min(max(rod_index, 0), num_rods)
+        else:
+            rod_index = 0
+        if inclusive:
+            while rod_index > 0 and self.rod_x(rod_index - 1) >= x:
+                rod_index -= 1
+            while rod_index < num_rods and self.rod_x(rod_index) < x:
+                rod_index += 1
+        else:
+            while rod_index > 0 and self.rod_x(rod_index - 1) > x:
+                rod_index -= 1
+            while rod_index < num_rods and self.rod_x(rod_index) <= x:
+                rod_index += 1
+        return rod_index
+
+    def rod_at(self, x):
+        """Index of the rod whose click area (two bead radii either side) contains x, or None."""
+        if self.viewport_mode and not (self.frame_margin <= x <= self.width - self.frame_margin):
+            return None # Rods scrolled under the margins are not clickable
+        reach = self.bead_size
+        rod_index = self._first_rod_from(x - reach)
+        if rod_index < self.num_rods and self.rod_x(rod_index) <= x + reach:
+            return rod_index
+        return None
+
+    def hit_test(self, x, y, rods=None):
+        """Returns (rod_index, bead_type, bead_index) for a click at (x, y), or None.
+
+        `rods` (Abacus.rods) gives the current bead positions: where rectangles
+        overlap, a bead actually drawn at that pixel wins over an empty position.
+        Between beads drawn there (overlapping sprites), or between empty positions,
+        the rectangle whose center is nearest the click wins.
+        """
+        rod_index = self.rod_at(x)
+        if rod_index is None or not (0 <= y <= self.height):
+            return None
+        candidates = self._row_hits[int(y)]
+        if not candidates:
+            return None
+        if rods is not None:
+            rod = rods[rod_index]
+            for _, bead_type, bead_index, bead_pos in candidates:
+                if rod[bead_type + '_beads'][bead_index] == bead_pos:
+                    return (rod_index, bead_type, bead_index)
+        _, bead_type, bead_index, _ = candidates[0]
+        return (rod_index, bead_type, bead_index)
+
+    def rod_rect(self, rod_index):
+        """(x, y, width, height) covering everything drawn for one rod, for partial repaints."""
+        half_width = self.column_half_width
+        return (self.rod_x(rod_index) - half_width, self.column_top,
+                2 * half_width + 1, self.column_bottom - self.column_top + 1)
+
+    def rods_between(self, left, right):
+        """Range of rod indices whose column overlaps the x-span [left, right]."""
+        half_width = self.column_half_width
+        if self.viewport_mode: # Only rods inside the frame window are ever drawn
+            left = max(left, self.frame_margin)
+            right = min(right, self.width - self.frame_margin)
+        return range(self._first_rod_from(left - half_width), self._first_rod_from(right + half_width, False))
+
+    def visible_rods(self):
+        return self.rods_between(0, self.width)
+
+    def scroll_to_show(self, rod_index):
+        """Smallest scroll_x change that brings a rod's column fully inside the frame."""
+        half_width = self.column_half_width
+        center = self.frame_margin + (rod_index + 1) * self.rod_spacing
+        left_limit = center - half_width - self.frame_margin # scroll_x at which the rod touches the left edge
+        right_limit = center + half_width - (self.width - self.frame_margin)
+        scroll_x = min(max(self.scroll_x, right_limit), left_limit)
+        return min(max(int(scroll_x), 0), self.max_scroll)
+
+    def bead_rect(self, rod_index, bead_type, bead_index, bead_pos):
+        """(x, y, width, height) of a bead drawn in the given position."""
+        y = self.bead_ys[bead_type][bead_index][bead_pos]
+        return (self.rod_x(rod_index) - self.bead_radius, y, self.bead_size, self.bead_size)
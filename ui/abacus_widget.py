@@ -1,15 +1,31 @@
+import time
+
 from PyQt6.QtWidgets import QWidget
-from PyQt6.QtGui import QPainter, QColor, QPen
-from PyQt6.QtCore import Qt, QSize, pyqtSignal, QTimer
+from PyQt6.QtGui import QPainter, QColor, QPen, QPixmap
+from PyQt6.QtCore import Qt, QSize, QRect, pyqtSignal, QTimer
 from abacus import Abacus # Import the Abacus model
+from abacus.history import History
+from ui.abacus_layout import AbacusLayout
+from ui.animation import AnimationScheduler
 
 class AbacusWidget(QWidget):
-    valueChanged = pyqtSignal(int) # Signal to emit the abacus's current value
+    # Emitted with None whenever rods change; read the value from self.abacus
+    # (get_value_str() stays cheap on long abaci, unlike building the int).
+    valueChanged = pyqtSignal(object)
+    scrollRangeChanged = pyqtSignal(int) # Maximum horizontal scroll offset in viewport mode
+    scrollChanged = pyqtSignal(int) # Current horizontal scroll offset
+
+    FRAME_INTERVAL_MS = 16 # ~60 fps tick for the animation scheduler
+    WHEEL_STEP_RODS = 3 # Rods scrolled per mouse wheel notch in viewport mode
 
-    def __init__(self, num_rods=13):
+    def __init__(self, num_rods=13, viewport_mode=None):
         super().__init__()
         self.num_rods = num_rods
         self.abacus = Abacus(num_rods=num_rods) # Create an instance of the Abacus model
+        self.history = History(self.abacus) # Undo/redo of clicks (with their cascades) and other edits
+        # True: fixed rod spacing with a scrollable window onto the rods. False: fit every
+        # rod into the width. None: fit while rods stay at least rod_pitch apart, else scroll.
+        self.viewport_mode = viewport_mode
 
         self.setMinimumSize(QSize(800, 400)) # Make it more elongated
 
@@ -19,162 +35,225 @@ class AbacusWidget(QWidget):
         self.bead_radius = 15
         self.heaven_bead_spacing = self.bead_radius * 2 + 5
         self.earth_bead_spacing = self.bead_radius * 2 + 5
-
-        # Connect the carry animation signal to its handler
-        
-
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        self.rod_pitch = self.bead_radius * 2 + 10 # Rod spacing in viewport mode
 
         # Define colors
-        frame_color = QColor(139, 69, 19) # SaddleBrown
-        beam_color = QColor(160, 82, 45) # Sienna
-        rod_color = QColor(100, 100, 100) # Dark Gray
-        heaven_bead_color = QColor(255, 0, 0) # Red
-        earth_bead_color = QColor(0, 0, 255) # Blue
-
-        # Dimensions
-        widget_width = self.width()
-        widget_height = self.height()
-
-        abacus_width = widget_width - 2 * self.frame_margin
-        abacus_height = widget_height - 2 * self.frame_margin
+        self.frame_color = QColor(139, 69, 19) # SaddleBrown
+        self.beam_color = QColor(160, 82, 45) # Sienna
+        self.rod_color = QColor(100, 100, 100) # Dark Gray
+        self.heaven_bead_color = QColor(255, 0, 0) # Red
+        self.earth_bead_color = QColor(0, 0, 255) # Blue
+
+        self._layout = None # AbacusLayout shared by painting and hit-testing, see _get_layout()
+        self._background = None # QPixmap of frame, beam and rods, rebuilt with the layout
+        self._bead_sprites = None # Pre-rendered heaven/earth bead QPixmaps
+        self._scroll_x = 0 # Horizontal scroll offset in viewport mode, in pixels
+
+        # Bead moves and carry cascades are paced by one scheduler driven by a frame-rate timer
+        self._frame_timer = QTimer(self)
+        self._frame_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._frame_timer.setInterval(self.FRAME_INTERVAL_MS)
+        self.animation = AnimationScheduler(
+            self.abacus, self._repaint_rods, self.valueChanged.emit,
+            start_timer=self._frame_timer.start, stop_timer=self._frame_timer.stop)
+        self._frame_timer.timeout.connect(self.animation.tick)
+
+    @property
+    def stats(self):
+        """The abacus's live Stats (abacus.stats), or None while stats are off."""
+        return self.abacus.stats
+
+    def enable_stats(self):
+        """Starts counting model calls, paints and queue depth; returns the live Stats."""
+        return self.abacus.enable_stats()
+
+    def _uses_viewport(self):
+        if self.viewport_mode is not None:
+            return self.viewport_mode
+        fitted_spacing = (self.width() - 2 * self.frame_margin) / (self.num_rods + 1)
+        return fitted_spacing < self.rod_pitch
+
+    def _get_layout(self):
+        """Returns the cached geometry, rebuilding it after a resize or rod count change."""
+        layout = self._layout
+        if layout is None or layout.num_rods != self.num_rods or \
+           layout.width != self.width() or layout.height != self.height():
+            old_max_scroll = layout.max_scroll if layout is not None else 0
+            layout = self._layout = AbacusLayout(
+                self.width(), self.height(), self.num_rods,
+                self.frame_margin, self.beam_height, self.bead_radius, self.earth_bead_spacing,
+                rod_pitch=self.rod_pitch if self._uses_viewport() else None)
+            self._scroll_x = layout.scroll_x = min(self._scroll_x, layout.max_scroll)
+            if layout.max_scroll != old_max_scroll:
+                self.scrollRangeChanged.emit(layout.max_scroll)
+            # Static parts and bead sprites depend on the geometry, so render them again
+            self._background = self._render_background(layout)
+            self._bead_sprites = {
+                "heaven": self._render_bead_sprite(self.heaven_bead_color),
+                "earth": self._render_bead_sprite(self.earth_bead_color),
+            }
+        return layout
+
+    def resizeEvent(self, event):
+        self._layout = None # Rebuilt on the next paint or click
+        super().resizeEvent(event)
+
+    def _new_pixmap(self, width, height):
+        # Render at device resolution so cached pixmaps stay sharp on high-DPI screens
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(max(1, int(width * ratio)), max(1, int(height * ratio)))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        return pixmap
+
+    def _render_background(self, layout):
+        """Pre-renders the frame, beam and (unless scrolling) rod lines, which only change on resize."""
+        pixmap = self._new_pixmap(layout.width, layout.height)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
 
         # Draw outer frame
-        painter.setBrush(frame_color)
+        painter.setBrush(self.frame_color)
         painter.setPen(Qt.PenStyle.NoPen)
-        painter.drawRect(self.frame_margin, self.frame_margin, abacus_width, abacus_height)
+        painter.drawRect(self.frame_margin, self.frame_margin, layout.abacus_width, layout.abacus_height)
 
         # Draw the beam (divider)
-        self.beam_y = self.frame_margin + abacus_height / 4 # Adjusted for elongation
-        painter.setBrush(beam_color)
-        painter.drawRect(self.frame_margin, int(self.beam_y), abacus_width, self.beam_height)
-
-        # Draw rods and beads
-        rod_spacing = abacus_width / (self.num_rods + 1)
-        
-        for i in range(self.num_rods):
-            rod_x = int(self.frame_margin + (i + 1) * rod_spacing)
-
-            # Draw rod
-            painter.setPen(QPen(rod_color, 2))
-            painter.drawLine(rod_x, self.frame_margin + 10, rod_x, widget_height - self.frame_margin - 10)
-
-            # Draw heaven beads (2 per rod)
-            painter.setBrush(heaven_bead_color)
-            for j, bead_pos in enumerate(self.abacus.rods[i]['heaven_beads']):
-                bead_y = 0
-                if j == 0: # Top heaven bead
-                    heaven_up_y = self.frame_margin + 10 # Top of frame + frame thickness
-                    heaven_down_y = int(self.beam_y - self.bead_radius * 2 - 5) # Top of beam - bead height - small offset
-                else: # Bottom heaven bead
-                    heaven_up_y = self.frame_margin + 10 + self.bead_radius * 2 + 5 # y_up_0 + bead height + small gap
-                    heaven_down_y = int(self.beam_y - self.bead_radius * 2) # Top of beam - bead height (touching beam)
-
-                bead_y = heaven_down_y if bead_pos == 1 else heaven_up_y
-
-                painter.drawEllipse(rod_x - self.bead_radius, int(bead_y), self.bead_radius * 2, self.bead_radius * 2)
-
-            # Draw earth beads (5 per rod)
-            painter.setBrush(earth_bead_color)
-            for j, bead_pos in enumerate(self.abacus.rods[i]['earth_beads']):
-                # Y position for earth beads when they are "up" (touching the beam)
-                earth_up_y = int(self.beam_y + self.beam_height + 5 + j * self.earth_bead_spacing)
-                # Y position for earth beads when they are "down" (at the bottom of the section)
-                earth_down_y = int(widget_height - self.frame_margin - (5 - j) * self.earth_bead_spacing - 5)
-
-                bead_y = earth_up_y if bead_pos == 1 else earth_down_y
-
-                painter.drawEllipse(rod_x - self.bead_radius, int(bead_y), self.bead_radius * 2, self.bead_radius * 2)
-
-    def mousePressEvent(self, event):
-        if event.button() == Qt.MouseButton.LeftButton:
-            click_x = event.position().x()
-            click_y = event.position().y()
-
-            widget_width = self.width()
-            abacus_width = widget_width - 2 * self.frame_margin
-            rod_spacing = abacus_width / (self.num_rods + 1)
-
-            # Determine clicked rod
-            # Iterate through rods to find which one was clicked
-            clicked_rod_index = -1
-            for i in range(self.num_rods):
-                rod_x_center = int(self.frame_margin + (i + 1) * rod_spacing)
-                # Check if click_x is within the vicinity of this rod
-                if (rod_x_center - self.bead_radius * 2) <= click_x <= (rod_x_center + self.bead_radius * 2):
-                    clicked_rod_index = i
-                    break
-            
-            if clicked_rod_index != -1:
-                # Determine if heaven or earth bead was clicked
-                # Heaven beads are above the beam, Earth beads are below
-                if click_y < self.beam_y: # Click in heaven bead section
-                    # Determine which heaven bead was clicked
-                    # There are 2 heaven beads per rod
-                    for j in range(2):
-                        heaven_up_y = self.frame_margin + 10 + j * (self.bead_radius * 2 + 5) # Adjusted for new spacing
-                        heaven_down_y = int(self.beam_y - self.bead_radius * 2) # Adjusted for new spacing
-
-                        # Check if click_y is within the bead's area (either up or down position)
-                        if (heaven_up_y <= click_y <= (heaven_up_y + self.bead_radius * 2)) or \
-                           (heaven_down_y <= click_y <= (heaven_down_y + self.bead_radius * 2)):
-                            changes, carry_info = self.abacus.move_bead(clicked_rod_index, "heaven", j)
-                            self.valueChanged.emit(self.abacus.get_value()) # Emit signal immediately
-                            if carry_info:
-                                self._start_visual_carry_animation(clicked_rod_index, changes, carry_info)
-                            else:
-                                self.apply_bead_changes(clicked_rod_index, changes)
-                                self.update()
-                            break
-                elif click_y > (self.beam_y + self.beam_height): # Click in earth bead section
-                    # Determine which earth bead was clicked
-                    # There are 5 earth beads per rod
-                    for j in range(5):
-                        earth_up_y = int(self.beam_y + self.beam_height + 5 + j * self.earth_bead_spacing)
-                        earth_down_y = int(self.height() - self.frame_margin - (5 - j) * self.earth_bead_spacing - 5)
-
-                        if (earth_up_y <= click_y <= (earth_up_y + self.bead_radius * 2)) or \
-                           (earth_down_y <= click_y <= (earth_down_y + self.bead_radius * 2)):
-                            changes, carry_info = self.abacus.move_bead(clicked_rod_index, "earth", j)
-                            self.valueChanged.emit(self.abacus.get_value()) # Emit signal immediately
-                            if carry_info:
-                                self._start_visual_carry_animation(clicked_rod_index, changes, carry_info)
-                            else:
-                                self.apply_bead_changes(clicked_rod_index, changes)
-                                self.update()
-                            break
-
-    def apply_bead_changes(self, rod_index, changes):
-        """Applies a list of bead changes to the abacus model."""
-        for bead_type, bead_index, new_position in changes:
-            self.abacus.rods[rod_index][f'{bead_type}_beads'][bead_index] = new_position
-
-    def _start_visual_carry_animation(self, rod_index, changes_for_current_rod, carry_info):
-        """Initiates the delayed visual animation for carry operations."""
-        QTimer.singleShot(500, lambda: self._apply_visual_changes_and_trigger_next_carry(rod_index, changes_for_current_rod, carry_info))
-
-    def _apply_visual_changes_and_trigger_next_carry(self, rod_index, changes_for_current_rod, carry_info):
-        """Applies visual changes to the current rod and then triggers the next carry."""
-        self.apply_bead_changes(rod_index, changes_for_current_rod)
-        self.update()
-
-        if carry_info:
-            QTimer.singleShot(500, lambda: self._apply_delayed_bead_change(*carry_info))
+        painter.setBrush(self.beam_color)
+        painter.drawRect(self.frame_margin, int(layout.beam_y), layout.abacus_width, self.beam_height)
+
+        # Draw rods. In viewport mode they move with the scroll offset, so paintEvent
+        # draws the visible ones instead.
+        if not layout.viewport_mode:
+            painter.setPen(QPen(self.rod_color, 2))
+            for i in range(layout.num_rods):
+                rod_x = layout.rod_x(i)
+                painter.drawLine(rod_x, layout.rod_top, rod_x, layout.rod_bottom)
+        painter.end()
+        return pixmap
+
+    def _render_bead_sprite(self, color):
+        """Pre-renders one bead, including its 1px outline overhang on each side."""
+        size = self.bead_radius * 2
+        pixmap = self._new_pixmap(size + 2, size + 2)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(QPen(self.rod_color, 2)) # Beads are outlined with the rod pen
+        painter.setBrush(color)
+        painter.drawEllipse(1, 1, size, size)
+        painter.end()
+        return pixmap
+
+    def update_rod(self, rod_index):
+        """Schedules a repaint of a single rod's column (if it is on screen)."""
+        layout = self._get_layout()
+        if rod_index in layout.visible_rods():
+            self.update(QRect(*layout.rod_rect(rod_index)))
+
+    def _frame_rect(self):
+        layout = self._get_layout()
+        return QRect(self.frame_margin, self.frame_margin, layout.abacus_width, layout.abacus_height)
+
+    def scroll_x(self):
+        return self._scroll_x
+
+    def set_scroll_x(self, scroll_x):
+        """Scrolls the viewport to a pixel offset, clamped to the scroll range."""
+        layout = self._get_layout()
+        scroll_x = min(max(int(scroll_x), 0), layout.max_scroll)
+        if scroll_x == self._scroll_x:
+            return
+        dx = self._scroll_x - scroll_x
+        self._scroll_x = layout.scroll_x = scroll_x
+        # Qt moves the already painted pixels and repaints only the uncovered strip
+        self.scroll(dx, 0, self._frame_rect())
+        self.scrollChanged.emit(scroll_x)
+
+    def ensure_rod_visible(self, rod_index):
+        layout = self._get_layout()
+        if layout.viewport_mode:
+            self.set_scroll_x(layout.scroll_to_show(rod_index))
+
+    def wheelEvent(self, event):
+        layout = self._get_layout()
+        if not layout.viewport_mode:
+            return super().wheelEvent(event)
+        delta = event.angleDelta()
+        notches = (delta.x() or delta.y()) / 120
+        self.set_scroll_x(self._scroll_x - notches * self.WHEEL_STEP_RODS * layout.rod_spacing)
+        event.accept()
 
-    def _apply_delayed_bead_change(self, rod_index, bead_type, bead_index, carry_type):
-        """Applies delayed bead changes and handles cascading carries."""
-        if rod_index < 0: # Cannot carry to a rod less than 0
+    def paintEvent(self, event):
+        stats = self.abacus.stats
+        if stats is None:
+            self._paint(event)
             return
+        start = time.perf_counter()
+        self._paint(event)
+        stats.record_paint(time.perf_counter() - start)
+
+    def _paint(self, event):
+        layout = self._get_layout()
+        painter = QPainter(self)
 
-        # Simulate the move on the target rod
-        changes, next_carry_info = self.abacus.move_bead(rod_index, bead_type, bead_index)
-        self.apply_bead_changes(rod_index, changes)
-        self.update()
-        self.valueChanged.emit(self.abacus.get_value())
+        # Static parts come from the cached pixmap; Qt clips the blit to the dirty region
+        painter.drawPixmap(0, 0, self._background)
+
+        # Draw beads, only for rods inside the dirty region
+        dirty = event.rect()
+        rods = layout.rods_between(dirty.left(), dirty.right())
+        if layout.viewport_mode:
+            # Scrolled rods are drawn here and clipped to the frame window
+            painter.setClipRect(self._frame_rect())
+            painter.setPen(QPen(self.rod_color, 2))
+            for i in rods:
+                rod_x = layout.rod_x(i)
+                painter.drawLine(rod_x, layout.rod_top, rod_x, layout.rod_bottom)
+        heaven_ys = layout.bead_ys["heaven"]
+        earth_ys = layout.bead_ys["earth"]
+        heaven_sprite = self._bead_sprites["heaven"]
+        earth_sprite = self._bead_sprites["earth"]
+        for i in rods:
+            rod = self.abacus.rods[i]
+            sprite_x = layout.rod_x(i) - self.bead_radius - 1
+
+            # Heaven beads (2 per rod), down (1) against the beam
+            for j, bead_pos in enumerate(rod['heaven_beads']):
+                painter.drawPixmap(sprite_x, heaven_ys[j][bead_pos] - 1, heaven_sprite)
+
+            # Earth beads (5 per rod), up (1) against the beam
+            for j, bead_pos in enumerate(rod['earth_beads']):
+                painter.drawPixmap(sprite_x, earth_ys[j][bead_pos] - 1, earth_sprite)
 
-        if next_carry_info:
-            QTimer.singleShot(500, lambda: self._apply_delayed_bead_change(*next_carry_info)) # Cascade delayed carry
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            # Rod from the layout's fixed spacing, bead by a per-row lookup resolved
+            # against the rod's current bead positions where rectangles overlap
+            hit = self._get_layout().hit_test(event.position().x(), event.position().y(), self.abacus.rods)
+            if hit is not None:
+                self._click_bead(*hit)
 
+    def _click_bead(self, rod_index, bead_type, bead_index):
+        # The scheduler applies the move now if idle, otherwise after the running cascade
+        self.animation.submit_move(rod_index, bead_type, bead_index)
 
+    def apply_bead_changes(self, rod_index, changes):
+        """Applies a list of bead changes to the abacus model and repaints that rod."""
+        self.abacus.apply_changes(rod_index, changes)
+        if changes:
+            self.update_rod(rod_index)
+
+    def undo(self):
+        """Reverts the last operation; a cascade still playing is finished first."""
+        self.animation.flush() # The cascade belongs to the operation being undone
+        self.animation.publish_changes(self.history.undo() or [])
+
+    def redo(self):
+        self.animation.flush()
+        self.animation.publish_changes(self.history.redo() or [])
+
+    def _repaint_rods(self, rod_indices):
+        """Scheduler callback: one column invalidation per rod changed during a tick."""
+        # Follow a carry cascade as it moves left past the edge of the viewport
+        self.ensure_rod_visible(rod_indices[0])
+        for rod_index in rod_indices:
+            self.update_rod(rod_index)
@@ -0,0 +1,139 @@
+import time
+from collections import deque
+
+
+class AnimationScheduler:
+    """Single queue that paces bead moves and carry cascades for AbacusWidget.
+
+    Submitted operations (Abacus.iter_steps() tuples such as ('move', rod_index,
+    bead_type, bead_index) or ('add', n)) wait in a queue and only become step
+    generators when their turn comes, so a click made during a cascade runs after
+    it instead of acting on a half-updated abacus. One step is pulled from the
+    running operation every `step_interval / speed` seconds; a cascade is just the
+    rest of that operation's steps, so it finishes before later clicks run.
+
+    The scheduler is driven by tick(), which the widget calls from one frame-rate
+    QTimer. `clock`, `start_timer` and `stop_timer` are injectable, so the
+    scheduler can be stepped with a fake clock without a display. Repaints and
+    value notifications are coalesced to one call per tick. The value callback
+    gets None rather than the value: listeners read what they need from the
+    abacus, so a tick never pays for rebuilding the int of a long abacus.
+    """
+
+    DEFAULT_STEP_INTERVAL = 0.5 # Seconds between cascade steps at speed 1.0
+
+    def __init__(self, abacus, on_rods_changed, on_value_changed, step_interval=DEFAULT_STEP_INTERVAL,
+                 clock=time.monotonic, start_timer=None, stop_timer=None):
+        self.abacus = abacus
+        self.step_interval = step_interval
+        self.speed = 1.0 # Multiplier on the step rate, e.g. 4.0 plays a cascade four times faster
+        self.instant = False # When True every submitted operation applies at once
+        self._on_rods_changed = on_rods_changed # Called with the sorted indices of repainted rods
+        self._on_value_changed = on_value_changed # Called with None after any rod changed
+        self._clock = clock
+        self._start_timer = start_timer
+        self._stop_timer = stop_timer
+        self._queue = deque() # Operations waiting to start
+        self._steps = None # Step generator of the running operation
+        self._running_move = False # A move's steps end at its first step without a carry
+        self._next_due = None # Clock time at which the next step runs
+        self._dirty_rods = set()
+
+    @property
+    def pending(self):
+        """Number of operations not finished yet, including the running one."""
+        return len(self._queue) + (self._steps is not None)
+
+    def is_idle(self):
+        return self._steps is None and not self._queue
+
+    def submit_move(self, rod_index, bead_type, bead_index):
+        """Queues a bead click; it runs immediately when nothing else is pending."""
+        self.submit(('move', rod_index, bead_type, bead_index))
+
+    def submit(self, operation):
+        """Queues any Abacus.iter_steps() operation behind the ones already pending.
+
+        When nothing is pending the operation starts at once, so its ValueError (if
+        it does not fit) reaches the caller. A queued operation that no longer fits
+        when its turn comes is skipped.
+        """
+        if self.is_idle():
+            self._start(operation)
+            self._run_step()
+            if not self.is_idle(): # More steps to come; pace them from now on
+                self._next_due = self._clock() + self._current_interval()
+                if self._start_timer is not None:
+                    self._start_timer()
+        else:
+            self._queue.append(operation) # Runs after the current cascade and earlier clicks
+        if self.abacus.stats is not None:
+            self.abacus.stats.record_pending(self.pending)
+        if self.instant:
+            self.flush()
+        else:
+            self._publish()
+
+    def tick(self):
+        """Runs every step that is due by now, then publishes one coalesced update."""
+        if not self.is_idle():
+            now = self._clock()
+            while not self.is_idle() and now >= self._next_due:
+                self._run_step()
+                self._next_due += self._current_interval()
+        self._publish()
+        if self.is_idle():
+            self._idle()
+
+    def flush(self):
+        """Applies everything still queued at once (instant mode, undo, shutdown)."""
+        while self._run_step():
+            pass
+        self._publish()
+        self._idle()
+
+    def publish_changes(self, rod_indices):
+        """Reports rods changed outside the scheduler (undo/redo) through the usual callbacks."""
+        self._dirty_rods.update(rod_indices)
+        self._publish()
+
+    def _current_interval(self):
+        return self.step_interval / self.speed
+
+    def _start(self, operation):
+        self._steps = self.abacus.iter_steps(operation)
+        self._running_move = operation[0] == 'move'
+
+    def _run_step(self):
+        """Pulls one step, starting queued operations as needed; False once all are done."""
+        while True:
+            if self._steps is None:
+                if not self._queue:
+                    return False
+                try:
+                    self._start(self._queue.popleft())
+                except ValueError:
+                    continue
+            step = next(self._steps, None)
+            if step is None: # Operation finished; its next step is the next operation's first
+                self._steps = None
+                continue
+            rod_index, changes, carry_info = step
+            if changes:
+                self._dirty_rods.add(rod_index)
+            if self._running_move and (carry_info is None or carry_info[0] < 0):
+                self._steps = None # Cascade over; don't hold the timer for an empty step
+            return True
+
+    def _publish(self):
+        if not self._dirty_rods:
+            return
+        dirty_rods = sorted(self._dirty_rods)
+        self._dirty_rods.clear()
+        self._on_rods_changed(dirty_rods)
+        self._on_value_changed(None)
+
+    def _idle(self):
+        self._next_due = None
+        if self._stop_timer is not None:
+            self._stop_timer()
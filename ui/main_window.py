@@ -0,0 +1,90 @@
+from PyQt6.QtWidgets import QMainWindow, QVBoxLayout, QWidget, QLineEdit, QScrollBar, QLabel
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QKeySequence, QShortcut
+from ui.abacus_widget import AbacusWidget
+
+class AbacusWindow(QMainWindow):
+    STATS_REFRESH_MS = 500 # How often the stats overlay re-reads the counters
+
+    def __init__(self, num_rods=13):
+        super().__init__()
+        self.setWindowTitle("Abacus Calculator")
+        self.setGeometry(100, 100, 800, 600) # Adjust size as needed
+
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        layout = QVBoxLayout(central_widget)
+
+        # Value display at the top
+        self.value_display = QLineEdit()
+        self.value_display.setReadOnly(True) # Make it read-only
+        self.value_display.setAlignment(Qt.AlignmentFlag.AlignRight) # Align text to the right
+        self.value_display.setStyleSheet("font-size: 30px; padding: 5px;") # Style it
+        layout.addWidget(self.value_display)
+
+        self.abacus_widget = AbacusWidget(num_rods=num_rods)
+        layout.addWidget(self.abacus_widget)
+
+        # Horizontal scroll bar for abaci with more rods than fit; hidden otherwise
+        self.scroll_bar = QScrollBar(Qt.Orientation.Horizontal)
+        self.scroll_bar.setSingleStep(self.abacus_widget.rod_pitch)
+        self.scroll_bar.hide()
+        layout.addWidget(self.scroll_bar)
+        self.abacus_widget.scrollRangeChanged.connect(self.update_scroll_range)
+        self.abacus_widget.scrollChanged.connect(self.scroll_bar.setValue)
+        self.scroll_bar.valueChanged.connect(self.abacus_widget.set_scroll_x)
+
+        # Connect the abacus widget's valueChanged signal to update the display
+        self.abacus_widget.valueChanged.connect(self.update_value_display)
+
+        # Undo/redo: Ctrl+Z and Ctrl+Shift+Z (plus the platform's own redo key, e.g. Ctrl+Y)
+        QShortcut(QKeySequence(QKeySequence.StandardKey.Undo), self, self.abacus_widget.undo)
+        QShortcut(QKeySequence("Ctrl+Shift+Z"), self, self.abacus_widget.redo)
+        if QKeySequence(QKeySequence.StandardKey.Redo) != QKeySequence("Ctrl+Shift+Z"):
+            QShortcut(QKeySequence(QKeySequence.StandardKey.Redo), self, self.abacus_widget.redo)
+
+        # Stats overlay over the abacus (F3), created on first use; see abacus.stats
+        self.stats_overlay = None
+        self._stats_timer = QTimer(self)
+        self._stats_timer.setInterval(self.STATS_REFRESH_MS)
+        self._stats_timer.timeout.connect(self.update_stats_overlay)
+        QShortcut(QKeySequence("F3"), self, self.toggle_stats_overlay)
+
+        # Initialize display with current abacus value
+        self.update_value_display(None)
+
+        self.show()
+
+    def update_value_display(self, value):
+        # Formatted from the rod digits, which also works past Python's 4300-digit str(int) limit
+        self.value_display.setText(self.abacus_widget.abacus.get_value_str())
+
+    def show_stats_overlay(self, visible=True):
+        """Shows or hides the stats overlay; showing it turns stats collection on."""
+        if visible and self.stats_overlay is None:
+            self.abacus_widget.enable_stats()
+            self.stats_overlay = QLabel(self.abacus_widget)
+            self.stats_overlay.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+            self.stats_overlay.setStyleSheet(
+                "background: rgba(0, 0, 0, 160); color: white; font-family: monospace; padding: 4px;")
+            self.stats_overlay.move(4, 4)
+        if self.stats_overlay is None:
+            return
+        self.stats_overlay.setVisible(visible)
+        if visible:
+            self.update_stats_overlay()
+            self._stats_timer.start()
+        else:
+            self._stats_timer.stop() # Counting goes on; only the display stops
+
+    def toggle_stats_overlay(self):
+        self.show_stats_overlay(self.stats_overlay is None or not self.stats_overlay.isVisible())
+
+    def update_stats_overlay(self):
+        self.stats_overlay.setText(self.abacus_widget.stats.snapshot().format())
+        self.stats_overlay.adjustSize()
+
+    def update_scroll_range(self, max_scroll):
+        self.scroll_bar.setRange(0, max_scroll)
+        self.scroll_bar.setPageStep(max(1, self.abacus_widget.width() - 2 * self.abacus_widget.frame_margin))
+        self.scroll_bar.setVisible(max_scroll > 0)